@@ -0,0 +1,47 @@
+"""
+図形種別の高速集計
+- Numbaが利用可能ならJITコンパイル版を使用
+- 利用できない場合はNumPy実装にフォールバック
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # Numbaがない場合はNumPy実装を使う
+
+# 図形種別コード（int8）
+RECT = 0
+LINE = 1
+CURVE = 2
+OTHER = -1
+
+TYPE_CODES = {'r': RECT, 'l': LINE, 'c': CURVE}
+
+
+def _tally_numpy(type_codes: np.ndarray):
+    """種別コード配列から(矩形, 線, 曲線)の件数を返す（NumPy版）"""
+    counts = np.bincount(type_codes[type_codes >= 0], minlength=3)
+    return int(counts[RECT]), int(counts[LINE]), int(counts[CURVE])
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _tally_jit(type_codes):
+        """種別コード配列から(矩形, 線, 曲線)の件数を返す（Numba版）"""
+        rect = 0
+        line = 0
+        curve = 0
+        for code in type_codes:
+            if code == 0:
+                rect += 1
+            elif code == 1:
+                line += 1
+            elif code == 2:
+                curve += 1
+        return rect, line, curve
+
+    tally = _tally_jit
+else:
+    tally = _tally_numpy
@@ -6,18 +6,72 @@
 """
 
 import fitz
+import re
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 import numpy as np
 from enum import Enum
 import json
 import os
+import sys
+import atexit
 from datetime import datetime
 from PIL import Image
-import io
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from functools import partial
+from collections import OrderedDict
+from contextlib import contextmanager
+import itertools
+import threading
+import queue
+import logging
 import multiprocessing
 
+from core._fast_tally import TYPE_CODES, OTHER, tally
+
+logger = logging.getLogger(__name__)
+
+# MuPDF由来の例外（PyMuPDFのバージョンによりmupdf.FzErrorBaseが存在する）
+_MUPDF_ERRORS = (RuntimeError, ValueError)
+if hasattr(fitz, 'mupdf') and hasattr(fitz.mupdf, 'FzErrorBase'):
+    _MUPDF_ERRORS += (fitz.mupdf.FzErrorBase,)
+
+# GIL無効（free-threaded）ビルドかどうか。GIL有効時はスレッド並列を使わない
+_GIL_DISABLED = not getattr(sys, '_is_gil_enabled', lambda: True)()
+
+# ページ処理用の常駐スレッドプール（呼び出しごとのスレッド生成を避ける）
+_THREAD_POOL = ThreadPoolExecutor(max_workers=min(multiprocessing.cpu_count(), 8))
+atexit.register(_THREAD_POOL.shutdown)
+
+# ステップ表記パターン（例: STEP1, 手順①）
+_STEP_PATTERN = re.compile(r'(STEP|ステップ|手順|Phase|フェーズ|工程)\s*[0-9０-９①-⑩]')
+# 正規表現の前に使う部分文字列チェック（いずれも含まないページは正規表現を省略）
+_STEP_TRIGGERS = ('STEP', 'ステップ', '手順', 'Phase', 'フェーズ', '工程')
+_NUMBER_LIST_PATTERN = re.compile(r'[①-⑩]|[1-9]\.\s')
+_ARROW_CHARS = '→←↑↓⇒⇐⇑⇓➡⬅⬆⬇'
+_ARROW_TEXT_PATTERN = re.compile(f'[{_ARROW_CHARS}]')
+# 2〜3本の線分のみで構成されるパス（矢じり・矢印）
+_ARROW_SHAPE_PATTERN = re.compile(rb'(?<![^|])l{2,3}(?![^|])')
+
+# 図番号参照パターン（実際の図ではない）
+_REFERENCE_PATTERN = re.compile('|'.join([
+    r'図\s*\d+[-\.]\d+\s*の通り',
+    r'図\s*\d+[-\.]\d+\s*を参照',
+    r'図\s*\d+[-\.]\d+\s*に示す',
+    r'図\s*\d+[-\.]\d+\s*参照',
+    r'図\s*\d+\s*の通り',
+    r'図\s*\d+\s*を参照',
+    r'参考.*図\s*\d+',
+    r'前述の図\s*\d+',
+    r'次の図\s*\d+',
+    r'上記の図\s*\d+',
+    r'下記の図\s*\d+',
+    r'図\s*\d+[-\.]\d+\s*より',
+    r'図\s*\d+[-\.]\d+\s*から',
+    r'図\s*\d+[-\.]\d+\s*で示',
+    r'については図\s*\d+',
+]))
+
 class PageType(Enum):
     """ページタイプの定義"""
     PURE_TEXT = "pure_text"          # 純粋なテキスト
@@ -35,6 +89,19 @@ class ProcessingMethod(Enum):
     IMAGE_WITH_ANALYSIS = "image_ml"     # 画像化+ML解析
     HYBRID = "hybrid"                    # ハイブリッド
 
+# 処理方法の分類（ページごとのメンバーシップ判定用）
+_TEXT_METHODS = frozenset((ProcessingMethod.TEXT_ONLY, ProcessingMethod.STRUCTURED_EXTRACTION))
+_IMAGE_METHODS = frozenset((ProcessingMethod.IMAGE_WITH_GEMINI, ProcessingMethod.IMAGE_WITH_ANALYSIS))
+_RASTERIZE_METHODS = _IMAGE_METHODS | {ProcessingMethod.HYBRID}
+
+# 処理方法 → サマリーの集計キー（該当なしは hybrid_pages）
+_SUMMARY_KEYS = {
+    ProcessingMethod.TEXT_ONLY: 'text_pages',
+    ProcessingMethod.IMAGE_WITH_GEMINI: 'image_pages',
+    ProcessingMethod.IMAGE_WITH_ANALYSIS: 'image_pages',
+}
+_SUMMARY_KEYS_BY_VALUE = {method.value: key for method, key in _SUMMARY_KEYS.items()}
+
 @dataclass
 class PracticalConfig:
     """実用的な設定"""
@@ -61,6 +128,7 @@ class PracticalConfig:
     skip_page_patterns: List[str] = None        # スキップするページパターン
     figure_number_patterns: List[str] = None    # 図番号パターン
     image_dpi_multiplier: float = 2.0           # 画像化時のDPI倍率（デフォルト2倍）
+    parallel_backend: str = "process"           # 並列処理方式: process / thread（GIL無効ビルドのみ有効） / serial
 
     def __post_init__(self):
         if self.force_image_keywords is None:
@@ -78,6 +146,59 @@ class PracticalConfig:
                 r'Figure\s*\d+[-\.]\d+', # Figure 1-1
             ]
 
+def _find_tables(page: fitz.Page) -> List:
+    """表検出（失敗時は空リスト）"""
+    try:
+        table_finder = page.find_tables()
+    except _MUPDF_ERRORS as e:
+        logger.debug("ページ %d の表検出に失敗: %s", page.number + 1, e)
+        return []
+    # TableFinderが保持するリストをそのまま使う（コピーしない）
+    return table_finder.tables
+
+def _summarize_drawings(drawings: List[Dict]) -> Dict:
+    """図形リストを種別コード配列に変換し、件数を一括集計"""
+    n = len(drawings)
+    type_codes = np.fromiter(
+        (TYPE_CODES.get(d.get('type'), OTHER) for d in drawings), dtype=np.int8, count=n
+    )
+    rect_count, line_count, curve_count = tally(type_codes)
+    
+    # 矢印の検出: 各パスの描画命令の先頭文字（l/c/r/q）を'|'区切りの
+    # バイト列にまとめ、2〜3本の線分だけからなるパス（矢じり）を1回の走査で数える
+    item_stream = '|'.join(
+        ''.join(item[0][0] for item in d.get('items', ())) for d in drawings
+    ).encode('ascii', 'replace')
+    arrow_count = len(_ARROW_SHAPE_PATTERN.findall(item_stream))
+    
+    return {
+        'rect_count': int(rect_count),
+        'line_count': int(line_count),
+        'curve_count': int(curve_count),
+        'arrow_count': arrow_count,
+        'total': n
+    }
+
+def _image_arrays(page: fitz.Page) -> Dict[str, np.ndarray]:
+    """埋め込み画像の情報をSoA形式（xref・幅・高さの並列配列）で取得"""
+    image_list = page.get_images(full=True)
+    n = len(image_list)
+    return {
+        'xref': np.fromiter((img[0] for img in image_list), dtype=np.int32, count=n),
+        'width': np.fromiter((img[2] for img in image_list), dtype=np.int32, count=n),
+        'height': np.fromiter((img[3] for img in image_list), dtype=np.int32, count=n)
+    }
+
+# ページキャッシュに載せるMuPDF抽出処理
+_PAGE_EXTRACTORS = {
+    'text': lambda page: page.get_text(),
+    'text_dict': lambda page: page.get_text("dict"),
+    'images': _image_arrays,
+    # 件数だけが必要なので、Rect/Point変換を行わない軽量版のget_cdrawingsを使う
+    'drawing_summary': lambda page: _summarize_drawings(page.get_cdrawings()),
+    'tables': _find_tables,
+}
+
 class PracticalPageAnalyzer:
     """実用的なページ分析器"""
     
@@ -89,6 +210,68 @@ class PracticalPageAnalyzer:
             'figure_pages': 0,
             'skipped_pages': 0
         }
+        self._compile_patterns()
+        self._cost_map = self._build_cost_map()
+        
+        # MuPDF抽出結果のLRUキャッシュ: (id(doc), ページ番号) -> {'doc': doc, 抽出名: 結果}
+        # docへの参照を保持するため、キャッシュ中にidが再利用されることはない
+        self._page_cache: "OrderedDict[Tuple[int, int], Dict]" = OrderedDict()
+        self._page_cache_size = 64
+        self._page_cache_lock = threading.Lock()
+    
+    def _compile_patterns(self):
+        """設定されたキーワード・図番号パターンを正規表現に特化してコンパイル"""
+        # 強制画像化キーワードは1本の交互パターンにまとめ、テキストを1回だけ走査する
+        keywords = self.config.force_image_keywords
+        self._force_keyword_re = re.compile(
+            '|'.join(map(re.escape, keywords)) if keywords else r'(?!)'
+        )
+        
+        # 空のパターンリストは何にもマッチしない正規表現にする
+        patterns = self.config.figure_number_patterns or [r'(?!)']
+        self._figure_number_re = re.compile('|'.join(f'(?:{p})' for p in patterns))
+        
+        captions = []
+        for pattern in patterns:
+            # パターン1: 行頭に図番号がある（図番号の後にキャプションが続く）
+            captions.append(r'(?:^|\n)\s*' + pattern + r'[\s　:]')
+            # パターン2: 図番号が独立した行にある
+            captions.append(r'(?:^|\n)\s*' + pattern + r'\s*(?:\n|$)')
+            # パターン3: 中央揃えや特殊なフォーマットの図番号
+            captions.append(r'(?:^|\n)\s{3,}' + pattern + r'(?:\s|$)')
+        self._figure_caption_re = re.compile(
+            '|'.join(f'(?:{c})' for c in captions), re.MULTILINE
+        )
+    
+    def _get_page_data(self, page: fitz.Page, name: str):
+        """ページのMuPDF抽出結果をキャッシュ経由で取得（未取得なら抽出）"""
+        key = (id(page.parent), page.number)
+        with self._page_cache_lock:
+            entry = self._page_cache.get(key)
+            if entry is None:
+                entry = {'doc': page.parent}
+                self._page_cache[key] = entry
+                if len(self._page_cache) > self._page_cache_size:
+                    self._page_cache.popitem(last=False)
+            else:
+                self._page_cache.move_to_end(key)
+        
+        if name not in entry:
+            entry[name] = _PAGE_EXTRACTORS[name](page)
+        return entry[name]
+    
+    def get_page_text(self, page: fitz.Page) -> str:
+        """ページのテキストを取得（分析時に抽出済みなら再抽出しない）"""
+        return self._get_page_data(page, 'text')
+    
+    def get_page_tables(self, page: fitz.Page) -> List:
+        """ページの表検出結果を取得（分析時に検出済みなら再検出しない）"""
+        return self._get_page_data(page, 'tables')
+    
+    def clear_page_cache(self):
+        """ページキャッシュを破棄（ドキュメントを閉じた後に呼ぶ）"""
+        with self._page_cache_lock:
+            self._page_cache.clear()
     
     def analyze_page(self, page: fitz.Page, page_num: int) -> Dict:
         """段階的なページ分析"""
@@ -138,7 +321,7 @@ class PracticalPageAnalyzer:
     
     def _quick_screening(self, page: fitz.Page, page_num: int) -> Dict:
         """高速スクリーニング"""
-        text = page.get_text()
+        text = self.get_page_text(page)
         page_area = page.rect.width * page.rect.height
         
         # スキップパターンのチェック
@@ -150,7 +333,7 @@ class PracticalPageAnalyzer:
                 }
         
         # テキスト密度の計算
-        text_dict = page.get_text("dict")
+        text_dict = self._get_page_data(page, 'text_dict')
         text_blocks = [b for b in text_dict.get('blocks', []) if b.get('type') == 0]
         text_area = sum(
             abs((b['bbox'][2] - b['bbox'][0]) * (b['bbox'][3] - b['bbox'][1]))
@@ -158,84 +341,33 @@ class PracticalPageAnalyzer:
         )
         text_density = text_area / page_area if page_area > 0 else 0
         
-        # 画像の確認
-        images = page.get_images()
-        large_images = []
-        for img in images:
-            xref = img[0]
-            pix = None
-            try:
-                pix = fitz.Pixmap(page.parent, xref)
-                if pix.width * pix.height > self.config.quick_image_size_threshold:
-                    large_images.append((pix.width, pix.height))
-            except:
-                pass
-            finally:
-                # Pixmapのメモリを解放
-                if pix:
-                    pix = None
+        # 画像の確認（画像をデコードせず、get_imagesの幅・高さで判定）
+        images = self._get_page_data(page, 'images')
+        image_areas = images['width'].astype(np.int64) * images['height']
+        large_images_count = int(np.count_nonzero(
+            image_areas > self.config.quick_image_size_threshold
+        ))
         
         # 強制画像化キーワードのチェック
-        has_force_keywords = any(kw in text for kw in self.config.force_image_keywords)
+        has_force_keywords = self._force_keyword_re.search(text) is not None
         
         # 図番号パターンのチェック
-        import re
-        has_figure_number = False
-        has_figure_reference = False
-        
-        # 図番号参照パターン（実際の図ではない）
-        reference_patterns = [
-            r'図\s*\d+[-\.]\d+\s*の通り',
-            r'図\s*\d+[-\.]\d+\s*を参照',
-            r'図\s*\d+[-\.]\d+\s*に示す',
-            r'図\s*\d+[-\.]\d+\s*参照',
-            r'図\s*\d+\s*の通り',
-            r'図\s*\d+\s*を参照',
-            r'参考.*図\s*\d+',
-            r'前述の図\s*\d+',
-            r'次の図\s*\d+',
-            r'上記の図\s*\d+',
-            r'下記の図\s*\d+',
-            r'図\s*\d+[-\.]\d+\s*より',
-            r'図\s*\d+[-\.]\d+\s*から',
-            r'図\s*\d+[-\.]\d+\s*で示',
-            r'については図\s*\d+',
-        ]
-        
         # まず参照パターンをチェック
-        for pattern in reference_patterns:
-            if re.search(pattern, text):
-                has_figure_reference = True
-                break
+        has_figure_reference = _REFERENCE_PATTERN.search(text) is not None
         
         # 図番号パターンをチェック
-        for pattern in self.config.figure_number_patterns:
-            if re.search(pattern, text):
-                has_figure_number = True
-                break
+        has_figure_number = self._figure_number_re.search(text) is not None
         
         # 実際の図のキャプションかどうかを判定
         actual_figure = False
         if has_figure_number and not has_figure_reference:
             # 図番号が行頭にあるか、独立した行にあるかチェック
-            for pattern in self.config.figure_number_patterns:
-                # パターン1: 行頭に図番号がある（図番号の後にキャプションが続く）
-                if re.search(r'(?:^|\n)\s*' + pattern + r'[\s　:]', text, re.MULTILINE):
-                    actual_figure = True
-                    break
-                # パターン2: 図番号が独立した行にある
-                if re.search(r'(?:^|\n)\s*' + pattern + r'\s*(?:\n|$)', text, re.MULTILINE):
-                    actual_figure = True
-                    break
-                # パターン3: 中央揃えや特殊なフォーマットの図番号
-                if re.search(r'(?:^|\n)\s{3,}' + pattern + r'(?:\s|$)', text, re.MULTILINE):
-                    actual_figure = True
-                    break
+            actual_figure = self._figure_caption_re.search(text) is not None
         
         # 判定
         is_pure_text = (
             text_density > self.config.quick_text_density_threshold and
-            len(large_images) == 0 and
+            large_images_count == 0 and
             not has_force_keywords and
             not actual_figure  # 実際の図がある場合のみ画像化
         )
@@ -246,7 +378,7 @@ class PracticalPageAnalyzer:
             'confidence': 0.9 if is_pure_text else 0.5,
             'features': {
                 'text_density': text_density,
-                'large_images_count': len(large_images),
+                'large_images_count': large_images_count,
                 'has_force_keywords': has_force_keywords,
                 'has_figure_number': has_figure_number,
                 'has_figure_reference': has_figure_reference,
@@ -256,45 +388,30 @@ class PracticalPageAnalyzer:
     
     def _detailed_analysis(self, page: fitz.Page) -> Dict:
         """詳細分析（SmartPageAnalyzerの優れた機能を統合）"""
-        # PyMuPDFの表検出
-        try:
-            tables = list(page.find_tables())
-            table_info = []
-            for table in tables:
-                try:
-                    # セル数の計算
-                    cells = table.cells
-                    cell_count = len(cells) if cells else 0
-                    table_info.append({
-                        'cell_count': cell_count,
-                        'bbox': table.bbox
-                    })
-                except:
-                    pass
-        except:
+        # 図形要素の分析（1パスで集計済みのサマリーを使用）
+        drawing_summary = self._get_page_data(page, 'drawing_summary')
+        rect_count = drawing_summary['rect_count']
+        line_count = drawing_summary['line_count']
+        curve_count = drawing_summary['curve_count']
+        arrow_patterns = drawing_summary['arrow_count']
+        
+        # PyMuPDFの表検出（罫線ベースのため、図形が1つもないページでは省略）
+        if drawing_summary['total'] > 0:
+            tables = self._get_page_data(page, 'tables')
+        else:
             tables = []
-            table_info = []
-        
-        # 図形要素の分析（改良版）
-        drawings = list(page.get_drawings())
-        rect_count = 0
-        line_count = 0
-        curve_count = 0
-        arrow_patterns = 0
-        
-        for d in drawings:
-            d_type = d.get('type')
-            if d_type == 'r':  # rectangle
-                rect_count += 1
-            elif d_type == 'l':  # line
-                line_count += 1
-            elif d_type == 'c':  # curve
-                curve_count += 1
-            
-            # 矢印パターンの簡易検出
-            items = d.get('items', [])
-            if len(items) > 2:  # 複数の線が接続
-                arrow_patterns += 1
+        table_info = []
+        for table in tables:
+            # セル数の計算
+            try:
+                cells = table.cells
+            except _MUPDF_ERRORS as e:
+                logger.debug("表のセル取得に失敗: %s", e)
+                continue
+            table_info.append({
+                'cell_count': len(cells) if cells else 0,
+                'bbox': table.bbox
+            })
         
         # 視覚要素の存在確認（SmartPageAnalyzerから統合）
         has_visual_element = (
@@ -303,30 +420,25 @@ class PracticalPageAnalyzer:
             len(tables) > 0
         )
         
-        # 埋め込み画像の確認
-        significant_images = 0
-        try:
-            image_list = page.get_images(full=True)
-            for img in image_list:
-                xref = img[0]
-                try:
-                    base_image = page.parent.extract_image(xref)
-                    width = base_image.get("width", 0)
-                    height = base_image.get("height", 0)
-                    if width > 100 and height > 100:  # 100px以上を有意な画像とする
-                        significant_images += 1
-                        has_visual_element = True
-                except:
-                    pass
-        except:
-            pass
+        # 埋め込み画像の確認（100px以上を有意な画像とする）
+        images = self._get_page_data(page, 'images')
+        significant_images = int(np.count_nonzero(
+            (images['width'] > 100) & (images['height'] > 100)
+        ))
+        if significant_images > 0:
+            has_visual_element = True
         
         # テキストパターンの分析（拡張版）
-        text = page.get_text()
-        import re
-        has_step_pattern = bool(re.search(r'(STEP|ステップ|手順|Phase|フェーズ|工程)\s*[0-9０-９①-⑩]', text))
-        has_number_list = bool(re.search(r'[①-⑩]|[1-9]\.\s', text))
-        has_arrow_text = len(re.findall(r'[→←↑↓⇒⇐⇑⇓➡⬅⬆⬇]', text)) >= 3
+        text = self.get_page_text(page)
+        has_step_pattern = (
+            any(t in text for t in _STEP_TRIGGERS) and
+            _STEP_PATTERN.search(text) is not None
+        )
+        has_number_list = _NUMBER_LIST_PATTERN.search(text) is not None
+        has_arrow_text = (
+            any(c in text for c in _ARROW_CHARS) and
+            len(_ARROW_TEXT_PATTERN.findall(text)) >= 3
+        )
         
         return {
             'tables': table_info,
@@ -395,9 +507,9 @@ class PracticalPageAnalyzer:
         # デフォルト
         return PageType.PURE_TEXT, ProcessingMethod.TEXT_ONLY, 0.5
     
-    def _estimate_cost(self, method: ProcessingMethod) -> float:
-        """処理コストの見積もり"""
-        cost_map = {
+    def _build_cost_map(self) -> Dict[ProcessingMethod, float]:
+        """設定から処理方法ごとのコストを事前計算"""
+        return {
             ProcessingMethod.TEXT_ONLY: self.config.text_processing_cost,
             ProcessingMethod.STRUCTURED_EXTRACTION: self.config.structured_extraction_cost,
             ProcessingMethod.IMAGE_WITH_GEMINI: self.config.image_processing_cost,
@@ -405,7 +517,43 @@ class PracticalPageAnalyzer:
             ProcessingMethod.HYBRID: (self.config.text_processing_cost + 
                                     self.config.image_processing_cost) * 0.7
         }
-        return cost_map.get(method, 1.0)
+    
+    def _estimate_cost(self, method: ProcessingMethod) -> float:
+        """処理コストの見積もり"""
+        return self._cost_map.get(method, 1.0)
+
+class _AsyncImageWriter:
+    """画像ファイルの書き込みを別スレッドで行う（ページ処理と書き込みI/Oを重ねる）"""
+    
+    def __init__(self, maxsize: int = 32):
+        # キューの上限でメモリ上に溜まるPNGバイト列の数を制限する
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._errors = []
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def put(self, path: str, data: bytes):
+        """書き込み対象を登録（キューが満杯なら空くまで待つ）"""
+        self._queue.put((path, data))
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:  # 終了の合図
+                break
+            path, data = item
+            try:
+                with open(path, 'wb') as f:
+                    f.write(data)
+            except OSError as e:
+                self._errors.append((path, e))
+    
+    def close(self):
+        """残りの書き込みを完了させてスレッドを終了"""
+        self._queue.put(None)
+        self._thread.join()
+        for path, e in self._errors:
+            print(f"画像の保存エラー: {path} - {str(e)}")
 
 class PracticalDocumentProcessor:
     """実用的なドキュメント処理器"""
@@ -414,9 +562,46 @@ class PracticalDocumentProcessor:
         self.analyzer = PracticalPageAnalyzer(config)
         self.config = config or PracticalConfig()
         self.max_workers = min(multiprocessing.cpu_count(), 8)  # 最大8スレッドに制限
+        # 複数PDFで使い回すプロセスプール（open_pool/pool_scopeで作成）
+        self.pool = None
+    
+    def open_pool(self):
+        """ページ処理用のプロセスプールを作成（以降のprocess_pdf_parallelで共有）"""
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                            initializer=_init_page_worker,
+                                            initargs=(self.config,))
+        return self.pool
     
-    def process_pdf(self, pdf_path: str, output_dir: Optional[str] = None) -> Dict:
-        """PDFの実用的な処理"""
+    def close_pool(self):
+        """共有プロセスプールを終了"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+    
+    @contextmanager
+    def pool_scope(self):
+        """with文の間だけプロセスプールを維持し、ワーカー起動コストを複数PDFで償却する"""
+        created = self.pool is None
+        self.open_pool()
+        try:
+            yield self.pool
+        finally:
+            if created:
+                self.close_pool()
+    
+    def process_pdf(self, pdf_path: str, output_dir: Optional[str] = None,
+                    page_range: Optional[range] = None,
+                    max_visual_pages: Optional[int] = None) -> Dict:
+        """
+        PDFの実用的な処理
+        
+        Args:
+            pdf_path: PDFファイルのパス
+            output_dir: 出力ディレクトリ
+            page_range: 処理するページ番号の範囲（0始まり、省略時は全ページ）
+            max_visual_pages: 画像化ページがこの数に達したら処理を打ち切る
+        """
         start_time = datetime.now()
         doc = fitz.open(pdf_path)
         
@@ -436,39 +621,52 @@ class PracticalDocumentProcessor:
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
         
-        for page_num in range(doc.page_count):
-            page = doc[page_num]
-            
-            # ページ分析
-            analysis = self.analyzer.analyze_page(page, page_num)
-            
-            # スキップページ
-            if analysis.get('skip', False):
-                results['summary']['skipped_pages'] += 1
-                print(f"ページ {page_num + 1}: スキップ - {analysis['reason']}")
-                continue
-            
-            # 処理方法に応じた処理
-            page_result = self._process_page(page, page_num, analysis, output_dir)
-            results['processed_pages'].append(page_result)
-            
-            # サマリー更新
-            if analysis['processing_method'] == ProcessingMethod.TEXT_ONLY:
-                results['summary']['text_pages'] += 1
-            elif analysis['processing_method'] in [ProcessingMethod.IMAGE_WITH_GEMINI, 
-                                                  ProcessingMethod.IMAGE_WITH_ANALYSIS]:
-                results['summary']['image_pages'] += 1
-            else:
-                results['summary']['hybrid_pages'] += 1
-            
-            results['summary']['total_cost'] += analysis['cost_estimate']
-            
-            # 進捗表示
-            method = analysis['processing_method'].value
-            confidence = analysis['confidence']
-            print(f"ページ {page_num + 1}: {method} (信頼度: {confidence:.2f})")
+        if page_range is None:
+            page_range = range(doc.page_count)
+        visual_pages = 0
+        
+        # 画像の書き込みは別スレッドで行い、次のページの分析と重ねる
+        image_writer = _AsyncImageWriter() if output_dir else None
+        try:
+            for page_num in page_range:
+                page = doc[page_num]
+                
+                # ページ分析
+                analysis = self.analyzer.analyze_page(page, page_num)
+                
+                # スキップページ
+                if analysis.get('skip', False):
+                    results['summary']['skipped_pages'] += 1
+                    print(f"ページ {page_num + 1}: スキップ - {analysis['reason']}")
+                    continue
+                
+                # 処理方法に応じた処理
+                page_result = self._process_page(page, page_num, analysis, output_dir,
+                                                 image_writer)
+                results['processed_pages'].append(page_result)
+                
+                # サマリー更新
+                summary_key = _SUMMARY_KEYS.get(analysis['processing_method'], 'hybrid_pages')
+                results['summary'][summary_key] += 1
+                
+                results['summary']['total_cost'] += analysis['cost_estimate']
+                
+                # 進捗表示
+                method = analysis['processing_method'].value
+                confidence = analysis['confidence']
+                print(f"ページ {page_num + 1}: {method} (信頼度: {confidence:.2f})")
+                
+                # 画像化ページの上限に達したら残りのページは見ない
+                if analysis['processing_method'] in _RASTERIZE_METHODS:
+                    visual_pages += 1
+                    if max_visual_pages is not None and visual_pages >= max_visual_pages:
+                        break
+        finally:
+            if image_writer:
+                image_writer.close()
         
         doc.close()
+        self.analyzer.clear_page_cache()
         
         # 処理時間
         results['processing_time'] = (datetime.now() - start_time).total_seconds()
@@ -486,6 +684,34 @@ class PracticalDocumentProcessor:
         
         return results
     
+    def analyze_only(self, pdf_path: str, page_range: Optional[range] = None) -> List[Dict]:
+        """
+        ページ分析のみを行い、画像化・テキスト抽出は行わない
+        
+        Returns:
+            ページごとの判定結果（page_number, page_type, processing_method, confidence）
+        """
+        doc = fitz.open(pdf_path)
+        try:
+            if page_range is None:
+                page_range = range(doc.page_count)
+            
+            pages = []
+            for page_num in page_range:
+                analysis = self.analyzer.analyze_page(doc[page_num], page_num)
+                pages.append({
+                    'page_number': page_num + 1,
+                    'page_type': analysis['page_type'].value,
+                    'processing_method': analysis['processing_method'].value,
+                    'confidence': analysis['confidence'],
+                    'is_visual': analysis['processing_method'] in _RASTERIZE_METHODS,
+                    'skip': analysis.get('skip', False)
+                })
+            return pages
+        finally:
+            doc.close()
+            self.analyzer.clear_page_cache()
+    
     def process_pdf_parallel(self, pdf_path: str, output_dir: Optional[str] = None) -> Dict:
         """PDFの並列処理による高速化"""
         start_time = datetime.now()
@@ -507,44 +733,45 @@ class PracticalDocumentProcessor:
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
         
-        # ページ処理タスクを準備
-        page_tasks = []
-        for page_num in range(doc.page_count):
-            page_tasks.append((page_num, doc))
-        
-        # 並列処理
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # 各ページの処理をサブミット
-            future_to_page = {}
-            for page_num, _ in page_tasks:
-                future = executor.submit(self._process_page_parallel, pdf_path, page_num, output_dir)
-                future_to_page[future] = page_num
+        backend = self.config.parallel_backend
+        workers = min(self.max_workers, doc.page_count)
+        if backend == "process" and workers > 1:
+            page_results = self._process_pages_multiprocess(pdf_path, doc.page_count, output_dir)
+        elif backend == "thread" and _GIL_DISABLED:
+            page_results = self._process_pages_threaded(pdf_path, doc.page_count, output_dir)
+        else:
+            # GIL下ではCPUバウンドなスレッドは直列化されるだけなので、
+            # 開いているドキュメントのページを順に処理する（画像の書き込みのみ別スレッド）
+            image_writer = _AsyncImageWriter() if output_dir else None
+            try:
+                page_results = [
+                    self._analyze_and_process_page(doc[page_num], page_num, output_dir,
+                                                   image_writer)
+                    for page_num in range(doc.page_count)
+                ]
+            finally:
+                if image_writer:
+                    image_writer.close()
+        
+        # 結果を収集
+        for page_result in page_results:
+            if not page_result:
+                continue
+            results['processed_pages'].append(page_result)
+            
+            # サマリー更新
+            if 'skip' in page_result and page_result['skip']:
+                results['summary']['skipped_pages'] += 1
+            else:
+                summary_key = _SUMMARY_KEYS_BY_VALUE.get(page_result['processing_method'],
+                                                         'hybrid_pages')
+                results['summary'][summary_key] += 1
             
-            # 結果を収集
-            for future in as_completed(future_to_page):
-                page_num = future_to_page[future]
-                try:
-                    page_result = future.result()
-                    if page_result:
-                        results['processed_pages'].append(page_result)
-                        
-                        # サマリー更新
-                        if 'skip' in page_result and page_result['skip']:
-                            results['summary']['skipped_pages'] += 1
-                        elif page_result['processing_method'] == ProcessingMethod.TEXT_ONLY.value:
-                            results['summary']['text_pages'] += 1
-                        elif page_result['processing_method'] in [ProcessingMethod.IMAGE_WITH_GEMINI.value, 
-                                                                  ProcessingMethod.IMAGE_WITH_ANALYSIS.value]:
-                            results['summary']['image_pages'] += 1
-                        else:
-                            results['summary']['hybrid_pages'] += 1
-                        
-                        if 'cost_estimate' in page_result:
-                            results['summary']['total_cost'] += page_result['cost_estimate']
-                except Exception as e:
-                    print(f"ページ {page_num + 1} の処理中にエラー: {str(e)}")
+            if 'cost_estimate' in page_result:
+                results['summary']['total_cost'] += page_result['cost_estimate']
         
         doc.close()
+        self.analyzer.clear_page_cache()
         
         # ページ番号順にソート
         results['processed_pages'].sort(key=lambda x: x.get('page_number', 0))
@@ -564,20 +791,76 @@ class PracticalDocumentProcessor:
         
         return results
     
+    def _process_pages_multiprocess(self, pdf_path: str, page_count: int,
+                                    output_dir: Optional[str]) -> List[Optional[Dict]]:
+        """プロセスプールによるページ処理（ワーカーごとにPDFを1回だけ開く）"""
+        page_results = []
+        workers = min(self.max_workers, page_count)
+        # 共有プールがなければこの呼び出し用に作成する
+        own_pool = self.pool is None
+        executor = self.pool or ProcessPoolExecutor(max_workers=workers,
+                                                    initializer=_init_page_worker,
+                                                    initargs=(self.config,))
+        try:
+            # 呼び出しごとの識別子で、ワーカーが開いているPDFを切り替える
+            worker = partial(_process_page_in_worker, pdf_path=pdf_path,
+                             doc_key=next(_DOC_KEYS), output_dir=output_dir)
+            chunksize = max(1, page_count // (workers * 4))
+            for page_result, stats_delta in executor.map(worker, range(page_count),
+                                                         chunksize=chunksize):
+                page_results.append(page_result)
+                # ワーカー側で集計された分析統計を反映
+                for key, value in stats_delta.items():
+                    self.analyzer.stats[key] += value
+        finally:
+            if own_pool:
+                executor.shutdown()
+        return page_results
+    
+    def _process_pages_threaded(self, pdf_path: str, page_count: int,
+                                output_dir: Optional[str]) -> List[Optional[Dict]]:
+        """常駐スレッドプールによるページ処理（GIL無効ビルドでparallel_backend="thread"の場合）"""
+        page_results = []
+        # 各ページの処理をサブミット
+        future_to_page = {}
+        for page_num in range(page_count):
+            future = _THREAD_POOL.submit(self._process_page_parallel, pdf_path, page_num, output_dir)
+            future_to_page[future] = page_num
+        
+        # 結果を収集
+        for future in as_completed(future_to_page):
+            page_num = future_to_page[future]
+            try:
+                page_results.append(future.result())
+            except Exception as e:
+                print(f"ページ {page_num + 1} の処理中にエラー: {str(e)}")
+        return page_results
+    
     def _process_page_parallel(self, pdf_path: str, page_num: int, output_dir: Optional[str]) -> Optional[Dict]:
         """並列処理用のページ処理メソッド"""
         try:
             # 各スレッドで独立してドキュメントを開く
             doc = fitz.open(pdf_path)
-            page = doc[page_num]
-            
+        except Exception as e:
+            print(f"ページ {page_num + 1} の処理エラー: {str(e)}")
+            return None
+        
+        try:
+            return self._analyze_and_process_page(doc[page_num], page_num, output_dir)
+        finally:
+            doc.close()
+    
+    def _analyze_and_process_page(self, page: fitz.Page, page_num: int,
+                                  output_dir: Optional[str],
+                                  image_writer: Optional['_AsyncImageWriter'] = None) -> Optional[Dict]:
+        """1ページの分析と処理（エラー時はNone）"""
+        try:
             # ページ分析
             analysis = self.analyzer.analyze_page(page, page_num)
             
             # スキップページ
             if analysis.get('skip', False):
                 print(f"ページ {page_num + 1}: スキップ - {analysis['reason']}")
-                doc.close()
                 return {
                     'page_number': page_num + 1,
                     'skip': True,
@@ -585,14 +868,13 @@ class PracticalDocumentProcessor:
                 }
             
             # 処理方法に応じた処理
-            page_result = self._process_page(page, page_num, analysis, output_dir)
+            page_result = self._process_page(page, page_num, analysis, output_dir, image_writer)
             
             # 進捗表示
             method = analysis['processing_method'].value
             confidence = analysis['confidence']
             print(f"ページ {page_num + 1}: {method} (信頼度: {confidence:.2f})")
             
-            doc.close()
             return page_result
             
         except Exception as e:
@@ -600,7 +882,8 @@ class PracticalDocumentProcessor:
             return None
     
     def _process_page(self, page: fitz.Page, page_num: int, 
-                     analysis: Dict, output_dir: Optional[str]) -> Dict:
+                     analysis: Dict, output_dir: Optional[str],
+                     image_writer: Optional['_AsyncImageWriter'] = None) -> Dict:
         """ページの処理"""
         result = {
             'page_number': page_num + 1,
@@ -613,49 +896,51 @@ class PracticalDocumentProcessor:
         method = analysis['processing_method']
         
         # テキスト処理
-        if method in [ProcessingMethod.TEXT_ONLY, ProcessingMethod.STRUCTURED_EXTRACTION]:
-            result['text'] = page.get_text()
+        if method in _TEXT_METHODS:
+            result['text'] = self.analyzer.get_page_text(page)
             
             # 構造化抽出
             if method == ProcessingMethod.STRUCTURED_EXTRACTION:
-                tables = list(page.find_tables())
+                # 詳細分析で検出済みの表を再利用（find_tablesを再実行しない）
+                tables = self.analyzer.get_page_tables(page)
                 result['structured_data'] = []
                 for table in tables:
                     try:
                         df = table.to_pandas()
-                        result['structured_data'].append({
-                            'type': 'table',
-                            'data': df.to_dict('records')
-                        })
-                    except:
-                        pass
+                    except (ImportError, *_MUPDF_ERRORS) as e:
+                        logger.debug("ページ %d の表のDataFrame変換に失敗: %s", page_num + 1, e)
+                        continue
+                    result['structured_data'].append({
+                        'type': 'table',
+                        'data': df.to_dict('records')
+                    })
         
         # 画像処理
-        if method in [ProcessingMethod.IMAGE_WITH_GEMINI, ProcessingMethod.IMAGE_WITH_ANALYSIS, 
-                     ProcessingMethod.HYBRID]:
+        if method in _RASTERIZE_METHODS:
             # 画像化
             dpi_mult = getattr(self.config, 'image_dpi_multiplier', 2.0)
             mat = fitz.Matrix(dpi_mult, dpi_mult)  # 設定可能な解像度
             pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("png")
-            
+
             try:
-                with Image.open(io.BytesIO(img_data)) as img:
-                    result['image_size'] = img.size
-                    
-                    # 保存
-                    if output_dir:
-                        img_filename = f"page_{page_num+1:03d}_{analysis['page_type'].value}.png"
-                        img_path = os.path.join(output_dir, img_filename)
-                        img.save(img_path)
-                        result['image_path'] = img_path
+                result['image_size'] = (pix.width, pix.height)
+
+                # 保存（PILを経由せずMuPDFで直接PNGを書き出す）
+                if output_dir:
+                    img_filename = f"page_{page_num+1:03d}_{analysis['page_type'].value}.png"
+                    img_path = os.path.join(output_dir, img_filename)
+                    if image_writer:
+                        image_writer.put(img_path, pix.tobytes("png"))
+                    else:
+                        pix.save(img_path)
+                    result['image_path'] = img_path
             finally:
                 # Pixmapのメモリを解放
                 pix = None
             
             # ハイブリッドの場合はテキストも抽出
             if method == ProcessingMethod.HYBRID:
-                result['text'] = page.get_text()
+                result['text'] = self.analyzer.get_page_text(page)
         
         return result
     
@@ -672,6 +957,41 @@ class PracticalDocumentProcessor:
         else:
             return obj
 
+# プロセスプールのワーカー状態（処理器はワーカーごとに1回、PDFは処理対象が変わったときに開く）
+_worker_doc = None
+_worker_doc_key = None
+_worker_processor = None
+
+# process_pdf_parallel呼び出しごとの識別子（共有プールのワーカーが開くPDFの切り替えに使う）
+_DOC_KEYS = itertools.count()
+
+def _init_page_worker(config: PracticalConfig):
+    """ワーカープロセスの初期化: 処理器を1回だけ用意する"""
+    global _worker_processor
+    _worker_processor = PracticalDocumentProcessor(config)
+
+def _get_worker_doc(pdf_path: str, doc_key: int):
+    """このワーカーで開いているPDFを返す（別の呼び出しのPDFなら開き直す）"""
+    global _worker_doc, _worker_doc_key
+    if _worker_doc_key != doc_key:
+        if _worker_doc is not None:
+            _worker_doc.close()
+            _worker_processor.analyzer.clear_page_cache()
+        _worker_doc = fitz.open(pdf_path)
+        _worker_doc_key = doc_key
+    return _worker_doc
+
+def _process_page_in_worker(page_num: int, pdf_path: str, doc_key: int,
+                            output_dir: Optional[str]) -> Tuple[Optional[Dict], Dict]:
+    """ワーカープロセスで1ページを処理し、結果と分析統計の増分を返す"""
+    doc = _get_worker_doc(pdf_path, doc_key)
+    stats = _worker_processor.analyzer.stats
+    before = dict(stats)
+    page_result = _worker_processor._analyze_and_process_page(
+        doc[page_num], page_num, output_dir
+    )
+    return page_result, {key: stats[key] - before[key] for key in stats}
+
 def calculate_roi(results: Dict) -> Dict:
     """投資対効果（ROI）の計算"""
     summary = results['summary']
@@ -0,0 +1,121 @@
+"""
+処理サマリー（processing_summary）の読み書き
+- JSON: ijsonがあればページ単位でストリーミングし、サマリー全体をメモリに展開しない
+- msgpack+zstd: msgpackとzstandardがあればコンパクトなバイナリ形式で保存
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Tuple
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    import zstandard
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# サマリーファイルの拡張子
+JSON_SUFFIX = '.json'
+MSGPACK_SUFFIX = '.msgpack.zst'
+SUMMARY_SUFFIXES = (JSON_SUFFIX, MSGPACK_SUFFIX)
+
+# zstdの圧縮レベル（速度重視）
+_ZSTD_LEVEL = 3
+
+# processed_pagesより前に出力されるトップレベルの値
+_HEADER_KEYS = ('pdf_path', 'total_pages')
+
+
+def _read_header(summary_path: str) -> Dict[str, Any]:
+    """pdf_path/total_pagesだけを読み取る（通常は先頭にあるので揃った時点で打ち切り）"""
+    header = {}
+    with open(summary_path, 'rb') as f:
+        for prefix, _, value in ijson.parse(f, use_float=True):
+            if prefix in _HEADER_KEYS:
+                header[prefix] = value
+                if len(header) == len(_HEADER_KEYS):
+                    break
+    return header
+
+
+def _iter_pages(summary_path: str) -> Iterable[Dict]:
+    with open(summary_path, 'rb') as f:
+        yield from ijson.items(f, 'processed_pages.item', use_float=True)
+
+
+def is_summary_file(path: str) -> bool:
+    """サマリーファイル（JSONまたはmsgpack+zstd）かどうか"""
+    return str(path).endswith(SUMMARY_SUFFIXES)
+
+
+def write_summary(results: Dict, base_path, as_json: bool = False) -> Path:
+    """
+    サマリーを保存する
+
+    Args:
+        results: 処理結果
+        base_path: 拡張子を除いた保存先（例: output/processing_summary）
+        as_json: Trueなら（またはmsgpack/zstandardがなければ）インデント付きJSONで保存
+
+    Returns:
+        保存したファイルのパス
+    """
+    base_path = Path(base_path)
+    if not as_json and MSGPACK_AVAILABLE:
+        summary_file = base_path.with_name(base_path.name + MSGPACK_SUFFIX)
+        packed = msgpack.packb(results, default=str)
+        with open(summary_file, 'wb') as f:
+            f.write(zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(packed))
+        return summary_file
+
+    summary_file = base_path.with_name(base_path.name + JSON_SUFFIX)
+    if ORJSON_AVAILABLE:
+        with open(summary_file, 'wb') as f:
+            f.write(orjson.dumps(results, default=str,
+                                 option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+    return summary_file
+
+
+def load_summary(summary_path: str) -> Tuple[Dict[str, Any], Iterable[Dict]]:
+    """
+    サマリーを読み込む
+
+    Returns:
+        (pdf_path・total_pagesを含むヘッダー, processed_pagesの各ページ)
+        JSONかつijsonがある場合、ページはファイルから逐次読み出すイテレータになる
+    """
+    if str(summary_path).endswith(MSGPACK_SUFFIX):
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError(f"msgpack/zstandardがないため読み込めません: {summary_path}")
+        with open(summary_path, 'rb') as f:
+            data = msgpack.unpackb(zstandard.ZstdDecompressor().decompress(f.read()))
+        header = {key: data[key] for key in _HEADER_KEYS if key in data}
+        return header, data['processed_pages']
+
+    if not IJSON_AVAILABLE:
+        if ORJSON_AVAILABLE:
+            with open(summary_path, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        header = {key: data[key] for key in _HEADER_KEYS if key in data}
+        return header, data['processed_pages']
+
+    return _read_header(summary_path), _iter_pages(summary_path)
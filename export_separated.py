@@ -5,27 +5,351 @@ PDFから抽出したコンテンツをタイプ別に分離して保存
 - 画像 → images/
 """
 
-import json
+import csv
+import importlib.util
+import io
 import os
 import sys
 from pathlib import Path
-import fitz
-import pandas as pd
 import argparse
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+from collections import defaultdict, deque
+from itertools import islice
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from config.config import Config
-from core.practical_optimizer import PracticalDocumentProcessor, PracticalConfig
+from core.summary_io import is_summary_file, load_summary, write_summary
+
+# 書き込みバッファサイズ（64KiB）
+WRITE_BUFFER_SIZE = 1 << 16
+
+# 出力ファイルの区切り線（バイナリ書き込み用にエンコード済み）
+SEP40 = ("="*40 + "\n").encode('utf-8')
+SEP60 = ("="*60 + "\n").encode('utf-8')
+DASH40 = ("-"*40 + "\n").encode('utf-8')
+# コンソール表示用の区切り線
+RULE60 = "="*60
+
+# ページ単位のエクスポートを並列化するワーカー数と、並列化する最小ページ数
+# （プロセス起動コストを回収できない小さな文書は直列で処理）
+EXPORT_MAX_WORKERS = min(os.cpu_count() or 1, 6)
+PARALLEL_MIN_PAGES = 16
+# ワーカーへ1回に渡すページ数
+EXPORT_BATCH_SIZE = 8
+
+# 表の出力形式（--formats で選択）と拡張子・インデックス用の説明
+TABLE_FORMATS = {
+    'parquet': ('.parquet', 'Parquet形式'),
+    'csv': ('.csv', 'CSV形式'),
+    'xlsx': ('.xlsx', 'Excel形式（全表を1ブックに集約）'),
+    'md': ('.md', 'Markdown形式'),
+}
+DEFAULT_TABLE_FORMATS = ('parquet',)
+# ページごとの書き出しでDataFrameを必要とする形式
+_DATAFRAME_FORMATS = {'parquet', 'md'}
+# Excelは全ての表を1つのブックにまとめる（表ごとに1シート）
+EXCEL_BOOK_NAME = "all_tables.xlsx"
+# テキストのみのページをまとめたファイル
+MAIN_TEXT_NAME = "all_text_pages.txt"
+
+# 画像の配置方法（--image-mode）
+IMAGE_MODES = ('hardlink', 'copy', 'move')
+
+# 作成済みの画像タイプ別サブフォルダ（page_type -> パス、エクスポート1回分・プロセスごと）
+_type_dirs: Dict[str, str] = {}
+
+
+def _find_engine(*candidates: str) -> Optional[str]:
+    """インストール済みの最初のモジュール名を返す（importせずに探索のみ）"""
+    for name in candidates:
+        if importlib.util.find_spec(name) is not None:
+            return name
+    return None
+
+
+# 表の出力エンジンはプロセスごとに1回だけ解決する
+# Parquet: pyarrow優先、なければfastparquet
+_PARQUET_ENGINE = _find_engine('pyarrow', 'fastparquet')
+# Excel: 値のみの書き込みが速いxlsxwriter優先、なければopenpyxl
+_EXCEL_ENGINE = _find_engine('xlsxwriter', 'openpyxl')
+# Markdown: DataFrame.to_markdownはtabulateが必要
+_MARKDOWN_ENGINE = _find_engine('tabulate')
+
+
+def _encode_chunks(chunks):
+    """文字列はUTF-8にエンコードし、エンコード済みのbytesはそのまま返す"""
+    return (c if isinstance(c, bytes) else c.encode('utf-8') for c in chunks)
+
+
+def _write_all(path, chunks):
+    """チャンク（strまたはbytes）を1回のバッファ付き書き込みにまとめて保存"""
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.writelines(_encode_chunks(chunks))
+
+
+class _LazyTextWriter:
+    """最初の書き込み時にファイルを開くバッファ付きライター（書き込みがなければファイルを作らない）
+    チャンクはstrでもエンコード済みのbytesでもよい"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+    
+    def write(self, *chunks):
+        if self._fh is None:
+            self._fh = open(self.path, 'wb', buffering=WRITE_BUFFER_SIZE)
+        self._fh.writelines(_encode_chunks(chunks))
+    
+    @property
+    def written(self) -> bool:
+        return self._fh is not None
+    
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _LazyExcelBook:
+    """最初の表が追加された時点で作成するExcelブック（表ごとに1シート）"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._writer = None
+    
+    def add_sheet(self, sheet_name: str, rows: List[Dict], columns: List[str]):
+        import pandas as pd
+        if self._writer is None:
+            # xlsxwriterのconstant_memoryは行順の書き込みが前提で、
+            # pandasの書き込み順ではセルが欠落するため使わない
+            self._writer = pd.ExcelWriter(self.path, engine=_EXCEL_ENGINE)
+        pd.DataFrame(rows, columns=columns).to_excel(self._writer, sheet_name=sheet_name,
+                                                     index=False)
+    
+    @property
+    def written(self) -> bool:
+        return self._writer is not None
+    
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _write_csv_fast(path: str, rows: List[Dict], fieldnames: List[str]):
+    """レコードのリストをDataFrameを経由せずcsvモジュールで直接書き出す（fieldnames以外のキーは無視）"""
+    with open(path, 'w', newline='', encoding='utf-8-sig', buffering=WRITE_BUFFER_SIZE) as f:
+        # pandasのto_csvと同じ改行コードにそろえる
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator=os.linesep,
+                                extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _table_columns(rows) -> Optional[List[str]]:
+    """
+    表の列名を求める（空・行が辞書でない表はNone）
+    先頭行と最終行のキーが一致すれば全行同じ列とみなし、全行の走査を省く
+    """
+    if not rows or not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return None
+    if rows[0].keys() == rows[-1].keys():
+        columns = list(rows[0])
+    else:
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+    return columns or None
+
+
+def _save_table(rows: List[Dict], columns: List[str], tables_dir: str, formats: tuple,
+                page_num: int, idx: int) -> List[str]:
+    """
+    表を選択された形式で保存し、書き出したファイル名を返す
+    （Excelは呼び出し側で1つのブックにまとめるためここでは書き出さない）
+    """
+    name = f"page_{page_num:03d}_table_{idx+1}"
+    stem = f"{tables_dir}/{name}"
+    file_names = [name + TABLE_FORMATS[fmt][0] for fmt in formats if fmt != 'xlsx']
+    
+    if 'csv' in formats:
+        _write_csv_fast(f"{stem}.csv", rows, columns)
+    
+    # DataFrameが必要な形式がある場合だけ1回作って使い回す
+    # （pandasはこのときだけ読み込む）
+    if not _DATAFRAME_FORMATS.intersection(formats):
+        return file_names
+    import pandas as pd
+    df = pd.DataFrame(rows, columns=columns)
+    
+    if 'parquet' in formats:
+        # Parquetは列名が文字列である必要がある
+        df.rename(columns=str).to_parquet(
+            f"{stem}.parquet",
+            engine=_PARQUET_ENGINE, compression='zstd', index=False
+        )
+    
+    if 'md' in formats:
+        header = f"# ページ {page_num} - 表 {idx+1}\n\n"
+        if _MARKDOWN_ENGINE:
+            body = df.to_markdown(index=False)
+        else:
+            # tabulateがない場合は簡易形式で保存
+            body = df.to_string()
+        _write_all(f"{stem}.md", (header, body))
+    
+    return file_names
+
+
+def _stage_image(src: str, dst: str, mode: str):
+    """
+    画像を出力先に配置
+    
+    Args:
+        mode: 'hardlink'（同一ファイルシステムならリンク、不可ならコピー）、
+              'copy'（メタデータは複製しない）、'move'
+    """
+    if mode == 'move':
+        try:
+            # 同一ファイルシステムならrenameのみ（既存ファイルは置き換え）
+            os.replace(src, dst)
+        except OSError:
+            # 別デバイスの場合はコピーして元を削除
+            shutil.copyfile(src, dst)
+            os.unlink(src)
+        return
+    
+    # 既存ファイル（前回のリンクを含む）は置き換える
+    if os.path.exists(dst):
+        os.unlink(dst)
+    if mode == 'hardlink':
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # 別デバイス・リンク非対応の場合はコピー
+    # copyfileはLinuxではsendfileでカーネル内コピーされる
+    shutil.copyfile(src, dst)
+
+
+def _get_type_dir(images_dir: str, page_type: str) -> str:
+    """画像タイプ別のサブフォルダを返す（作成はタイプごとに1回）"""
+    type_dir = _type_dirs.get(page_type)
+    if type_dir is None:
+        type_dir = f"{images_dir}/{page_type}"
+        os.makedirs(type_dir, exist_ok=True)
+        _type_dirs[page_type] = type_dir
+    return type_dir
+
+
+def _export_one_page(page_info: Dict, dirs: Dict[str, str], opts: Dict) -> Optional[Dict]:
+    """
+    1ページ分のテキスト・表・画像を書き出す
+    （プロセスプールから呼び出せるようにトップレベルで定義）
+    
+    Returns:
+        スキップページはNone、それ以外はページ番号・メインテキスト（UTF-8のbytes）・書き出したファイル名
+    """
+    # スキップページは除外
+    if page_info.get('skip'):
+        return None
+    
+    page_num = page_info['page_number']
+    processing_method = page_info.get('processing_method')
+    result = {
+        'page_number': page_num,
+        'main_text': None,
+        'text_file': None,
+        'table_files': 0,
+        'table_names': [],
+        'excel_sheets': [],
+        'image_file': None,
+        'gemini_analyzed': 'gemini_analysis' in page_info
+    }
+    
+    # 1. テキストの処理
+    text = page_info.get('text')
+    if text is not None and text.strip():
+        # 本文は1回だけエンコードし、ページファイルとメインテキストで共有する
+        payload = text.encode('utf-8')
+        
+        # ページごとのテキストファイル
+        text_name = f"page_{page_num:03d}.txt"
+        _write_all(f"{dirs['text']}/{text_name}", (
+            f"# ページ {page_num}\n", SEP40, b"\n", payload
+        ))
+        result['text_file'] = text_name
+        
+        # テキストのみのページはメインテキストに追加（組み立ては呼び出し側）
+        if processing_method == 'text_only':
+            result['main_text'] = payload
+    
+    # 2. 表の処理
+    structured_data = page_info.get('structured_data')
+    if structured_data:
+        tables_dir = dirs['tables']
+        table_formats = opts['table_formats']
+        for idx, table_data in enumerate(structured_data):
+            if table_data.get('type') != 'table':
+                continue
+            rows = table_data.get('data')
+            columns = _table_columns(rows)
+            if columns is None:
+                continue  # 空または不正な表は書き出さない
+            
+            result['table_names'] += _save_table(rows, columns, tables_dir,
+                                                 table_formats, page_num, idx)
+            if 'xlsx' in table_formats:
+                # Excelシート名は31文字まで
+                sheet_name = f"p{page_num}_t{idx+1}"[:31]
+                result['excel_sheets'].append((sheet_name, rows, columns))
+            result['table_files'] += 1
+    
+    # 3. 画像の処理
+    image_path = page_info.get('image_path')
+    if image_path is not None and os.path.exists(image_path):
+        # 画像タイプごとのサブフォルダへ配置
+        page_type = page_info.get('page_type', 'unknown')
+        type_dir = _get_type_dir(dirs['images'], page_type)
+        image_name = os.path.basename(image_path)
+        _stage_image(image_path, f"{type_dir}/{image_name}", opts['image_mode'])
+        result['image_file'] = (page_type, image_name)
+        
+        # Gemini解析結果があればテキストファイルとして保存
+        if 'gemini_analysis' in page_info:
+            analysis_file = f"{type_dir}/{os.path.splitext(image_name)[0]}_analysis.txt"
+            _write_all(analysis_file, (
+                f"# ページ {page_num} - Gemini 2.0 Flash解析\n",
+                f"画像ファイル: {image_name}\n",
+                SEP60, b"\n",
+                page_info['gemini_analysis']
+            ))
+    
+    return result
+
+
+def _export_page_batch(batch: List[Dict], dirs: Dict[str, str], opts: Dict) -> List[Optional[Dict]]:
+    """複数ページをまとめて書き出す（プロセス間のやり取りをバッチ単位にする）"""
+    return [_export_one_page(page_info, dirs, opts) for page_info in batch]
 
 
 class SeparatedExporter:
     """コンテンツをタイプ別に分離してエクスポート"""
     
-    def __init__(self, base_output_dir: str = "output_separated"):
+    def __init__(self, base_output_dir: str = "output_separated",
+                 table_formats: Optional[List[str]] = None):
         self.base_output_dir = Path(base_output_dir)
+        self.table_formats = self._resolve_table_formats(table_formats)
         self.text_dir = self.base_output_dir / "text"
         self.tables_dir = self.base_output_dir / "tables"
         self.images_dir = self.base_output_dir / "images"
@@ -33,107 +357,210 @@ class SeparatedExporter:
         # ディレクトリ作成
         for dir_path in [self.text_dir, self.tables_dir, self.images_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
+        
+        # PDF処理器は最初のexport_from_pdf呼び出し時に作成し、以降は再利用
+        self._processor = None
+        
+        # begin〜finalizeの間のページ単位エクスポートの状態
+        self._session = None
     
-    def export_from_summary(self, summary_path: str) -> Dict[str, int]:
-        """
-        processing_summary.jsonから分離エクスポート
+    @staticmethod
+    def _resolve_table_formats(table_formats: Optional[List[str]]) -> tuple:
+        """表の出力形式を検証し、利用できないエンジンの形式を除外"""
+        formats = tuple(dict.fromkeys(table_formats or DEFAULT_TABLE_FORMATS))
+        unknown = [fmt for fmt in formats if fmt not in TABLE_FORMATS]
+        if unknown:
+            raise ValueError(f"未対応の表形式: {', '.join(unknown)}")
         
-        Returns:
-            各タイプのファイル数
+        if 'parquet' in formats and _PARQUET_ENGINE is None:
+            print("警告: pyarrow/fastparquetがないためParquet形式の出力をスキップします")
+            formats = tuple(fmt for fmt in formats if fmt != 'parquet')
+        if 'xlsx' in formats and _EXCEL_ENGINE is None:
+            print("警告: xlsxwriter/openpyxlがないためExcel形式の出力をスキップします")
+            formats = tuple(fmt for fmt in formats if fmt != 'xlsx')
+        
+        # 出力できる形式が残らなければCSVで保存
+        if not formats:
+            print("警告: 表はCSV形式で保存します")
+            formats = ('csv',)
+        return formats
+    
+    def _export_pages(self, pages: Iterable[Dict], page_count: int, image_mode: str,
+                      use_parallel: bool):
+        """
+        各ページを書き出し、スキップページ以外の結果をページ順に返す
+        （ページ数が多ければプロセスプールで並列処理。pagesは逐次読み出しのイテレータでもよい）
         """
-        with open(summary_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        dirs = self._page_dirs()
+        # 作成済みディレクトリの記録はエクスポートごとにリセット（プールのワーカーは毎回新規）
+        _type_dirs.clear()
+        opts = {'table_formats': self.table_formats, 'image_mode': image_mode}
         
-        stats = {
-            'text_pages': 0,
-            'table_files': 0,
-            'image_files': 0
-        }
+        workers = min(EXPORT_MAX_WORKERS, page_count)
+        if use_parallel and workers > 1 and page_count >= PARALLEL_MIN_PAGES:
+            page_results = self._export_pages_pooled(pages, workers, dirs, opts)
+        else:
+            page_results = (_export_one_page(page_info, dirs, opts) for page_info in pages)
         
-        # メインテキストファイル（テキストのみのページ）
-        main_text = []
+        for page_result in page_results:
+            if page_result is not None:
+                yield page_result
+    
+    def _page_dirs(self) -> Dict[str, str]:
+        """ページ書き出し先（パスは文字列で渡し、ページごとのPath生成を避ける）"""
+        return {'text': str(self.text_dir), 'tables': str(self.tables_dir),
+                'images': str(self.images_dir)}
+    
+    @staticmethod
+    def _export_pages_pooled(pages: Iterable[Dict], workers: int, dirs: Dict, opts: Dict):
+        """プロセスプールでバッチ単位に書き出す（未完了のバッチ数を制限して先読みしすぎない）"""
+        pages = iter(pages)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for batch in iter(lambda: list(islice(pages, EXPORT_BATCH_SIZE)), []):
+                pending.append(executor.submit(_export_page_batch, batch, dirs, opts))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    
+    def export_from_summary(self, summary_path: str, use_parallel: bool = True,
+                            image_mode: str = 'hardlink') -> Dict[str, int]:
+        """
+        処理サマリー（processing_summary.json/.msgpack.zst）から分離エクスポート
         
-        # ページごとに処理
-        for page_info in data['processed_pages']:
-            page_num = page_info['page_number']
-            
-            # スキップページは除外
-            if page_info.get('skip'):
-                continue
+        Args:
+            summary_path: 処理サマリーのパス
+            use_parallel: ページごとの書き出しを並列処理するか
+            image_mode: 画像の配置方法（hardlink/copy/move）
             
-            # 1. テキストの処理
-            if 'text' in page_info and page_info['text'].strip():
-                # ページごとのテキストファイル
-                text_file = self.text_dir / f"page_{page_num:03d}.txt"
-                with open(text_file, 'w', encoding='utf-8') as f:
-                    f.write(f"# ページ {page_num}\n")
-                    f.write("="*40 + "\n\n")
-                    f.write(page_info['text'])
-                
-                # メインテキストにも追加（画像ページ以外）
-                if page_info['processing_method'] == 'text_only':
-                    main_text.append(f"\n[ページ {page_num}]\n")
-                    main_text.append(page_info['text'])
-                    stats['text_pages'] += 1
+        Returns:
+            各タイプのファイル数
+        """
+        # ページは（ijsonがあれば）ファイルから逐次読み出す
+        header, pages = load_summary(summary_path)
+        return self.export_from_pages(header['total_pages'], pages, use_parallel=use_parallel,
+                                      image_mode=image_mode)
+    
+    def export_from_dict(self, results: Dict, use_parallel: bool = True,
+                         image_mode: str = 'hardlink') -> Dict[str, int]:
+        """
+        メモリ上の処理結果から分離エクスポート（サマリーの書き出し・再読み込みを省く）
+        
+        Args:
+            results: PracticalDocumentProcessorの処理結果
+            use_parallel: ページごとの書き出しを並列処理するか
+            image_mode: 画像の配置方法（hardlink/copy/move）
             
-            # 2. 表の処理
-            if 'structured_data' in page_info:
-                for idx, table_data in enumerate(page_info['structured_data']):
-                    if table_data['type'] == 'table' and table_data.get('data'):
-                        # CSV形式で保存
-                        table_file = self.tables_dir / f"page_{page_num:03d}_table_{idx+1}.csv"
-                        df = pd.DataFrame(table_data['data'])
-                        df.to_csv(table_file, index=False, encoding='utf-8-sig')
-                        
-                        # Excel形式でも保存（openpyxlが利用可能な場合のみ）
-                        try:
-                            excel_file = self.tables_dir / f"page_{page_num:03d}_table_{idx+1}.xlsx"
-                            df.to_excel(excel_file, index=False, engine='openpyxl')
-                        except ImportError:
-                            pass  # openpyxlがない場合はスキップ
-                        
-                        stats['table_files'] += 1
+        Returns:
+            各タイプのファイル数
+        """
+        return self.export_from_pages(results['total_pages'], results['processed_pages'],
+                                      use_parallel=use_parallel, image_mode=image_mode)
+    
+    def export_from_pages(self, total_pages: int, pages: Iterable[Dict], use_parallel: bool = True,
+                          image_mode: str = 'hardlink') -> Dict[str, int]:
+        """
+        処理済みページのストリームから分離エクスポート
+        
+        Args:
+            total_pages: 総ページ数
+            pages: processed_pagesの各ページ（ページ順のイテレータでもよい）
+            use_parallel: ページごとの書き出しを並列処理するか
+            image_mode: 画像の配置方法（hardlink/copy/move）
             
-            # 3. 画像の処理（既存の画像をコピー）
-            if 'image_path' in page_info:
-                src_path = Path(page_info['image_path'])
-                if src_path.exists():
-                    # 画像タイプごとにサブフォルダ作成
-                    page_type = page_info.get('page_type', 'unknown')
-                    type_dir = self.images_dir / page_type
-                    type_dir.mkdir(exist_ok=True)
-                    
-                    dst_path = type_dir / src_path.name
-                    shutil.copy2(src_path, dst_path)
-                    stats['image_files'] += 1
-                    
-                    # Gemini解析結果があればテキストファイルとして保存
-                    if 'gemini_analysis' in page_info:
-                        analysis_file = type_dir / f"{src_path.stem}_analysis.txt"
-                        with open(analysis_file, 'w', encoding='utf-8') as f:
-                            f.write(f"# ページ {page_num} - Gemini 2.0 Flash解析\n")
-                            f.write(f"画像ファイル: {src_path.name}\n")
-                            f.write("="*60 + "\n\n")
-                            f.write(page_info['gemini_analysis'])
-        
-        # メインテキストファイルを保存
-        if main_text:
-            main_text_file = self.text_dir / "all_text_pages.txt"
-            with open(main_text_file, 'w', encoding='utf-8') as f:
-                f.write("".join(main_text))
+        Returns:
+            各タイプのファイル数
+        """
+        self.begin(total_pages, image_mode=image_mode)
+        try:
+            page_results = self._export_pages(pages, total_pages, image_mode=image_mode,
+                                              use_parallel=use_parallel)
+            for page_result in page_results:
+                self._add_page_result(page_result)
+        except BaseException:
+            self._close_session()
+            raise
+        
+        return self.finalize()
+    
+    def begin(self, total_pages: int, image_mode: str = 'hardlink'):
+        """
+        ページ単位のエクスポートを開始（on_pageでページを渡し、finalizeで完了する）
+        
+        Args:
+            total_pages: 総ページ数
+            image_mode: 画像の配置方法（hardlink/copy/move）
+        """
+        _type_dirs.clear()
+        self._session = {
+            'total_pages': total_pages,
+            'opts': {'table_formats': self.table_formats, 'image_mode': image_mode},
+            'stats': {
+                'text_pages': 0,
+                'table_files': 0,
+                'image_files': 0,
+                'gemini_analyzed': 0
+            },
+            # 書き出したファイル名（インデックス用、ディレクトリ走査の代わり）
+            'manifest': {'text': [], 'tables': [], 'images': defaultdict(list)},
+            # メインテキストファイル（テキストのみのページ）は逐次書き出す
+            'main_text': _LazyTextWriter(self.text_dir / MAIN_TEXT_NAME),
+            'excel_book': _LazyExcelBook(self.tables_dir / EXCEL_BOOK_NAME),
+        }
+    
+    def on_page(self, page_info: Dict):
+        """1ページをその場で書き出す（beginの後、ページ順に呼ぶ）"""
+        self._add_page_result(
+            _export_one_page(page_info, self._page_dirs(), self._session['opts']))
+    
+    def finalize(self) -> Dict[str, int]:
+        """
+        ページ単位のエクスポートを完了し、インデックスを作成
+        
+        Returns:
+            各タイプのファイル数
+        """
+        session = self._session
+        self._close_session()
         
         # インデックスファイルを作成
-        self._create_index(data, stats)
+        if session['main_text'].written:
+            session['manifest']['text'].append(MAIN_TEXT_NAME)
+        self._create_index(session['total_pages'], session['stats'], session['manifest'])
         
-        return stats
+        return session['stats']
+    
+    def _add_page_result(self, page_result: Optional[Dict]):
+        """ページの書き出し結果をエクスポート中の状態に反映（スキップページはNone）"""
+        if page_result is None:
+            return
+        session = self._session
+        stats = session['stats']
+        self._record_page(page_result, stats, session['manifest'], session['excel_book'])
+        
+        # メインテキストにも追加（画像ページ以外）
+        if page_result['main_text'] is not None:
+            session['main_text'].write(f"\n[ページ {page_result['page_number']}]\n",
+                                       page_result['main_text'])
+            stats['text_pages'] += 1
     
-    def export_from_pdf(self, pdf_path: str, use_parallel: bool = True) -> Dict[str, int]:
+    def _close_session(self):
+        """エクスポート中に開いたファイルを閉じる"""
+        session, self._session = self._session, None
+        session['main_text'].close()
+        session['excel_book'].close()
+    
+    def export_from_pdf(self, pdf_path: str, use_parallel: bool = True,
+                        image_mode: str = 'move', json_summary: bool = False) -> Dict[str, int]:
         """
         PDFから直接分離エクスポート
         
         Args:
             pdf_path: PDFファイルのパス
             use_parallel: 並列処理を使用するか
+            image_mode: 一時ディレクトリからの画像の配置方法（hardlink/copy/move）
+            json_summary: 処理サマリーをmsgpack+zstdではなくJSONで保存するか
             
         Returns:
             各タイプのファイル数
@@ -144,9 +571,11 @@ class SeparatedExporter:
         temp_output = self.base_output_dir / "temp"
         temp_output.mkdir(exist_ok=True)
         
-        # PDFを処理
-        config = PracticalConfig()
-        processor = PracticalDocumentProcessor(config)
+        # PDFを処理（PyMuPDFを含む処理器は必要になった時点で読み込む）
+        if self._processor is None:
+            from core.practical_optimizer import PracticalDocumentProcessor, PracticalConfig
+            self._processor = PracticalDocumentProcessor(PracticalConfig())
+        processor = self._processor
         
         if use_parallel:
             results = processor.process_pdf_parallel(pdf_path, str(temp_output))
@@ -156,95 +585,39 @@ class SeparatedExporter:
         stats = {
             'text_pages': 0,
             'table_files': 0,
-            'image_files': 0
+            'image_files': 0,
+            'gemini_analyzed': 0
         }
+        # 書き出したファイル名（インデックス用、ディレクトリ走査の代わり）
+        manifest = {'text': [], 'tables': [], 'images': defaultdict(list)}
         
-        # メインテキストファイル
-        main_text = []
-        
-        # ページごとに処理
-        for page_info in results['processed_pages']:
-            page_num = page_info['page_number']
-            
-            # スキップページは除外
-            if page_info.get('skip'):
-                continue
-            
-            # 1. テキストの処理
-            if 'text' in page_info and page_info['text'].strip():
-                # ページごとのテキストファイル
-                text_file = self.text_dir / f"page_{page_num:03d}.txt"
-                with open(text_file, 'w', encoding='utf-8') as f:
-                    f.write(f"# ページ {page_num}\n")
-                    f.write("="*40 + "\n\n")
-                    f.write(page_info['text'])
+        # メインテキストファイル（テキストのみのページ）は逐次書き出す
+        main_text_file = self.text_dir / MAIN_TEXT_NAME
+        with _LazyTextWriter(main_text_file) as main_text, \
+                _LazyExcelBook(self.tables_dir / EXCEL_BOOK_NAME) as excel_book:
+            # ページごとに処理
+            page_results = self._export_pages(results['processed_pages'], results['total_pages'],
+                                              image_mode=image_mode, use_parallel=use_parallel)
+            for page_result in page_results:
+                self._record_page(page_result, stats, manifest, excel_book)
                 
                 # テキストのみのページはメインテキストに追加
-                if page_info['processing_method'] == 'text_only':
-                    main_text.append(f"\n[ページ {page_num}]\n")
-                    main_text.append("-"*40 + "\n")
-                    main_text.append(page_info['text'])
-                    main_text.append("\n")
+                if page_result['main_text'] is not None:
+                    main_text.write(
+                        f"\n[ページ {page_result['page_number']}]\n", DASH40,
+                        page_result['main_text'], b"\n"
+                    )
                     stats['text_pages'] += 1
-            
-            # 2. 表の処理
-            if 'structured_data' in page_info:
-                for idx, table_data in enumerate(page_info['structured_data']):
-                    if table_data['type'] == 'table' and table_data.get('data'):
-                        # CSV形式で保存
-                        table_file = self.tables_dir / f"page_{page_num:03d}_table_{idx+1}.csv"
-                        df = pd.DataFrame(table_data['data'])
-                        df.to_csv(table_file, index=False, encoding='utf-8-sig')
-                        
-                        # Excel形式でも保存（openpyxlが利用可能な場合のみ）
-                        try:
-                            excel_file = self.tables_dir / f"page_{page_num:03d}_table_{idx+1}.xlsx"
-                            df.to_excel(excel_file, index=False, engine='openpyxl')
-                        except ImportError:
-                            pass  # openpyxlがない場合はスキップ
-                        
-                        # Markdown形式でも保存（tabulateが利用可能な場合のみ）
-                        try:
-                            md_file = self.tables_dir / f"page_{page_num:03d}_table_{idx+1}.md"
-                            with open(md_file, 'w', encoding='utf-8') as f:
-                                f.write(f"# ページ {page_num} - 表 {idx+1}\n\n")
-                                f.write(df.to_markdown(index=False))
-                        except ImportError:
-                            # tabulateがない場合は簡易形式で保存
-                            md_file = self.tables_dir / f"page_{page_num:03d}_table_{idx+1}.md"
-                            with open(md_file, 'w', encoding='utf-8') as f:
-                                f.write(f"# ページ {page_num} - 表 {idx+1}\n\n")
-                                f.write(df.to_string())
-                        
-                        stats['table_files'] += 1
-            
-            # 3. 画像の処理
-            if 'image_path' in page_info:
-                src_path = Path(page_info['image_path'])
-                if src_path.exists():
-                    # 画像タイプごとにサブフォルダ作成
-                    page_type = page_info.get('page_type', 'unknown')
-                    type_dir = self.images_dir / page_type
-                    type_dir.mkdir(exist_ok=True)
-                    
-                    dst_path = type_dir / src_path.name
-                    shutil.move(str(src_path), str(dst_path))
-                    stats['image_files'] += 1
-        
-        # メインテキストファイルを保存
-        if main_text:
-            main_text_file = self.text_dir / "all_text_pages.txt"
-            with open(main_text_file, 'w', encoding='utf-8') as f:
-                f.write("".join(main_text))
+        
+        if main_text.written:
+            manifest['text'].append(main_text_file.name)
             print(f"メインテキスト保存: {main_text_file}")
         
-        # 処理サマリーも保存
-        summary_file = self.base_output_dir / "processing_summary.json"
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+        # 処理サマリーも保存（msgpack+zstd、json_summaryまたはライブラリがなければJSON）
+        write_summary(results, self.base_output_dir / "processing_summary", as_json=json_summary)
         
         # インデックスファイルを作成
-        self._create_index(results, stats)
+        self._create_index(results['total_pages'], stats, manifest)
         
         # 一時ディレクトリをクリーンアップ
         if temp_output.exists():
@@ -252,69 +625,85 @@ class SeparatedExporter:
         
         return stats
     
-    def _create_index(self, data: Dict, stats: Dict):
-        """インデックスファイルを作成"""
+    @staticmethod
+    def _record_page(page_result: Dict, stats: Dict, manifest: Dict,
+                     excel_book: _LazyExcelBook):
+        """ページの書き出し結果を統計とファイル一覧に反映し、表をExcelブックに追加"""
+        stats['gemini_analyzed'] += page_result['gemini_analyzed']
+        if page_result['text_file']:
+            manifest['text'].append(page_result['text_file'])
+        stats['table_files'] += page_result['table_files']
+        manifest['tables'].extend(page_result['table_names'])
+        for sheet_name, rows, columns in page_result['excel_sheets']:
+            if not excel_book.written:
+                manifest['tables'].append(EXCEL_BOOK_NAME)
+            excel_book.add_sheet(sheet_name, rows, columns)
+        if page_result['image_file']:
+            page_type, image_name = page_result['image_file']
+            manifest['images'][page_type].append(image_name)
+            stats['image_files'] += 1
+    
+    def _create_index(self, total_pages: int, stats: Dict, manifest: Dict):
+        """インデックスファイルを作成（ファイル一覧はエクスポート時に記録したものを使う）"""
         index_file = self.base_output_dir / "index.md"
         
-        # Gemini解析済みページ数をカウント
-        gemini_analyzed = sum(1 for page in data['processed_pages'] 
-                            if 'gemini_analysis' in page)
+        # 内容はメモリ上で組み立て、最後に1回で書き出す
+        f = io.StringIO()
+        f.write("# 抽出コンテンツインデックス\n\n")
         
-        with open(index_file, 'w', encoding='utf-8') as f:
-            f.write("# 抽出コンテンツインデックス\n\n")
-            
-            # 統計情報
-            f.write("## 統計\n")
-            f.write(f"- 総ページ数: {data['total_pages']}\n")
-            f.write(f"- テキストページ: {stats['text_pages']}\n")
-            f.write(f"- 表ファイル: {stats['table_files']}\n")
-            f.write(f"- 画像ファイル: {stats['image_files']}\n")
-            if gemini_analyzed > 0:
-                f.write(f"- Gemini解析済み: {gemini_analyzed}ページ\n")
-            f.write("\n")
-            
-            # ディレクトリ構造
-            f.write("## ディレクトリ構造\n")
-            f.write("```\n")
-            f.write(f"{self.base_output_dir.name}/\n")
-            f.write("├── text/          # テキストファイル\n")
-            f.write("│   ├── all_text_pages.txt  # メインテキスト\n")
-            f.write("│   └── page_XXX.txt        # ページごとのテキスト\n")
-            f.write("├── tables/        # 表データ\n")
-            f.write("│   ├── *.csv      # CSV形式\n")
-            f.write("│   ├── *.xlsx     # Excel形式\n")
-            f.write("│   └── *.md       # Markdown形式\n")
-            f.write("└── images/        # 画像ファイル\n")
-            f.write("    ├── flowchart/ # フローチャート\n")
-            f.write("    ├── diagram/   # ダイアグラム\n")
-            f.write("    └── table/     # 複雑な表\n")
-            f.write("```\n\n")
-            
-            # ファイルリスト
-            f.write("## ファイルリスト\n\n")
-            
-            # テキストファイル
-            f.write("### テキストファイル\n")
-            for text_file in sorted(self.text_dir.glob("*.txt")):
-                f.write(f"- {text_file.name}\n")
+        # 統計情報
+        f.write("## 統計\n")
+        f.write(f"- 総ページ数: {total_pages}\n")
+        f.write(f"- テキストページ: {stats['text_pages']}\n")
+        f.write(f"- 表ファイル: {stats['table_files']}\n")
+        f.write(f"- 画像ファイル: {stats['image_files']}\n")
+        if stats['gemini_analyzed'] > 0:
+            f.write(f"- Gemini解析済み: {stats['gemini_analyzed']}ページ\n")
+        f.write("\n")
+        
+        # ディレクトリ構造
+        f.write("## ディレクトリ構造\n")
+        f.write("```\n")
+        f.write(f"{self.base_output_dir.name}/\n")
+        f.write("├── text/          # テキストファイル\n")
+        f.write("│   ├── all_text_pages.txt  # メインテキスト\n")
+        f.write("│   └── page_XXX.txt        # ページごとのテキスト\n")
+        f.write("├── tables/        # 表データ\n")
+        for i, fmt in enumerate(self.table_formats):
+            branch = "└──" if i == len(self.table_formats) - 1 else "├──"
+            suffix, label = TABLE_FORMATS[fmt]
+            f.write(f"│   {branch} {'*' + suffix:<10} # {label}\n")
+        f.write("└── images/        # 画像ファイル\n")
+        f.write("    ├── flowchart/ # フローチャート\n")
+        f.write("    ├── diagram/   # ダイアグラム\n")
+        f.write("    └── table/     # 複雑な表\n")
+        f.write("```\n\n")
+        
+        # ファイルリスト
+        f.write("## ファイルリスト\n\n")
+        
+        # テキストファイル
+        f.write("### テキストファイル\n")
+        for text_name in sorted(manifest['text']):
+            f.write(f"- {text_name}\n")
+        f.write("\n")
+        
+        # 表ファイル
+        if manifest['tables']:
+            f.write("### 表ファイル\n")
+            for table_name in sorted(manifest['tables']):
+                f.write(f"- {table_name}\n")
             f.write("\n")
-            
-            # 表ファイル
-            if list(self.tables_dir.glob("*.csv")):
-                f.write("### 表ファイル\n")
-                for table_file in sorted(self.tables_dir.glob("*.csv")):
-                    f.write(f"- {table_file.name}\n")
-                f.write("\n")
-            
-            # 画像ファイル
-            if list(self.images_dir.rglob("*.png")):
-                f.write("### 画像ファイル\n")
-                for img_dir in sorted(self.images_dir.iterdir()):
-                    if img_dir.is_dir():
-                        f.write(f"\n#### {img_dir.name}\n")
-                        for img_file in sorted(img_dir.glob("*.png")):
-                            f.write(f"- {img_file.name}\n")
         
+        # 画像ファイル
+        if manifest['images']:
+            f.write("### 画像ファイル\n")
+            for page_type in sorted(manifest['images']):
+                f.write(f"\n#### {page_type}\n")
+                for image_name in sorted(manifest['images'][page_type]):
+                    f.write(f"- {image_name}\n")
+        
+        _write_all(index_file, (f.getvalue(),))
         print(f"インデックス作成: {index_file}")
 
 
@@ -335,16 +724,26 @@ def main():
   
   # シーケンシャル処理（メモリ節約）
   python export_separated.py input.pdf --sequential
+  
+  # 表をCSVとExcelでも保存
+  python export_separated.py input.pdf --formats parquet,csv,xlsx
 """
     )
     
-    parser.add_argument('input', help='入力ファイル（PDFまたはprocessing_summary.json）')
+    parser.add_argument('input', help='入力ファイル（PDFまたはprocessing_summary.json/.msgpack.zst）')
     parser.add_argument('-o', '--output', default='output_separated',
                        help='出力ディレクトリ（デフォルト: output_separated）')
     parser.add_argument('--from-summary', action='store_true',
-                       help='processing_summary.jsonから処理')
+                       help='処理サマリー（processing_summary.json/.msgpack.zst）から処理')
     parser.add_argument('--sequential', action='store_true',
                        help='シーケンシャル処理（並列処理を無効化）')
+    parser.add_argument('--image-mode', choices=IMAGE_MODES,
+                       help='画像の配置方法（デフォルト: JSONからはhardlink、PDFからはmove）')
+    parser.add_argument('--json-summary', action='store_true',
+                       help='処理サマリーをJSONで保存（デフォルトはmsgpack+zstd、未インストール時はJSON）')
+    parser.add_argument('--formats', default=','.join(DEFAULT_TABLE_FORMATS),
+                       help=f"表の出力形式（カンマ区切り: {','.join(TABLE_FORMATS)}、"
+                            f"デフォルト: {','.join(DEFAULT_TABLE_FORMATS)}）")
     
     args = parser.parse_args()
     
@@ -354,21 +753,29 @@ def main():
         sys.exit(1)
     
     # エクスポーター作成
-    exporter = SeparatedExporter(args.output)
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    try:
+        exporter = SeparatedExporter(args.output, table_formats=formats)
+    except ValueError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
     
     print(f"出力先: {exporter.base_output_dir}")
-    print("="*60)
+    print(RULE60)
     
     # 処理実行
-    if args.from_summary or args.input.endswith('.json'):
+    if args.from_summary or is_summary_file(args.input):
         # JSONから処理
-        stats = exporter.export_from_summary(args.input)
+        stats = exporter.export_from_summary(args.input, use_parallel=not args.sequential,
+                                             image_mode=args.image_mode or 'hardlink')
     else:
         # PDFから処理
-        stats = exporter.export_from_pdf(args.input, use_parallel=not args.sequential)
+        stats = exporter.export_from_pdf(args.input, use_parallel=not args.sequential,
+                                         image_mode=args.image_mode or 'move',
+                                         json_summary=args.json_summary)
     
     # 結果表示
-    print("\n" + "="*60)
+    print("\n" + RULE60)
     print("処理完了！")
     print(f"  テキストページ: {stats['text_pages']}")
     print(f"  表ファイル: {stats['table_files']}")
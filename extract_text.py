@@ -3,18 +3,24 @@ PDFからテキストを抽出して保存するツール
 処理済みのprocessing_summary.jsonまたは直接PDFから抽出可能
 """
 
-import json
 import os
 import sys
 from pathlib import Path
-import fitz
 import argparse
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from config.config import Config
-from core.practical_optimizer import PracticalDocumentProcessor, PracticalConfig
+from core.summary_io import is_summary_file, load_summary
+
+# 出力テキストの区切り線
+SEP60 = "="*60 + "\n"
+DASH40 = "-"*40 + "\n"
+
+
+def _format_table_rows(rows) -> str:
+    """表の各行をセル区切り「 | 」の1行にし、行ごとに改行を付けて連結"""
+    return "".join([" | ".join(map(str, row.values())) + "\n" for row in rows])
 
 
 def extract_text_from_summary(summary_path: str, output_path: Optional[str] = None) -> str:
@@ -28,16 +34,52 @@ def extract_text_from_summary(summary_path: str, output_path: Optional[str] = No
     Returns:
         抽出されたテキスト
     """
-    with open(summary_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # ページは（ijsonがあれば）ファイルから逐次読み出す
+    header, pages = load_summary(summary_path)
+    
+    if output_path is None:
+        output_path = Path(summary_path).parent / "extracted_text.txt"
+    
+    return extract_text_from_pages(header['pdf_path'], header['total_pages'], pages, output_path)
+
+
+def extract_text_from_dict(results: Dict, output_path: str) -> str:
+    """
+    メモリ上の処理結果からテキストを抽出（サマリーの書き出し・再読み込みを省く）
+    
+    Args:
+        results: PracticalDocumentProcessorの処理結果
+        output_path: 出力テキストファイルのパス
+    
+    Returns:
+        抽出されたテキスト
+    """
+    return extract_text_from_pages(results['pdf_path'], results['total_pages'],
+                                   results['processed_pages'], output_path)
+
+
+def extract_text_from_pages(pdf_path: str, total_pages: int, pages: Iterable[Dict],
+                            output_path: str) -> str:
+    """
+    処理済みページのストリームからテキストを抽出
+    
+    Args:
+        pdf_path: 元のPDFファイルのパス（見出し用）
+        total_pages: 総ページ数
+        pages: processed_pagesの各ページ（ページ順のイテレータでもよい）
+        output_path: 出力テキストファイルのパス
     
+    Returns:
+        抽出されたテキスト
+    """
     # テキストを結合
     all_text = []
-    all_text.append(f"# {Path(data['pdf_path']).name}\n")
-    all_text.append(f"総ページ数: {data['total_pages']}\n")
-    all_text.append("="*60 + "\n\n")
+    all_text.append(f"# {Path(pdf_path).name}\n")
+    all_text.append(f"総ページ数: {total_pages}\n")
+    all_text.append(SEP60)
+    all_text.append("\n")
     
-    for page_info in data['processed_pages']:
+    for page_info in pages:
         page_num = page_info['page_number']
         
         # スキップページは除外
@@ -46,7 +88,7 @@ def extract_text_from_summary(summary_path: str, output_path: Optional[str] = No
             continue
         
         all_text.append(f"\n[ページ {page_num}]\n")
-        all_text.append("-"*40 + "\n")
+        all_text.append(DASH40)
         
         # テキストコンテンツ
         if 'text' in page_info and page_info['text']:
@@ -59,9 +101,7 @@ def extract_text_from_summary(summary_path: str, output_path: Optional[str] = No
                 if table_data['type'] == 'table':
                     all_text.append("\n[表データ]\n")
                     # 表をテキスト形式で表現
-                    for row in table_data['data']:
-                        all_text.append(" | ".join(str(v) for v in row.values()))
-                        all_text.append("\n")
+                    all_text.append(_format_table_rows(table_data['data']))
         
         # 画像の場合はパスを記載
         if 'image_path' in page_info:
@@ -77,14 +117,11 @@ def extract_text_from_summary(summary_path: str, output_path: Optional[str] = No
                 all_text.append(page_info['gemini_analysis'])
                 all_text.append("\n")
     
-    # 結合
+    # 結合（断片のリストは書き込み前に解放）
     full_text = "".join(all_text)
+    del all_text
     
     # ファイルに保存
-    if output_path is None:
-        output_dir = Path(summary_path).parent
-        output_path = output_dir / "extracted_text.txt"
-    
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(full_text)
     
@@ -110,11 +147,13 @@ def extract_text_from_pdf(pdf_path: str, output_path: Optional[str] = None,
     
     all_text = []
     all_text.append(f"# {Path(pdf_path).name}\n")
-    all_text.append("="*60 + "\n\n")
+    all_text.append(SEP60)
+    all_text.append("\n")
     
     if use_optimizer:
         # 最適化処理を使用
         print("最適化処理でテキスト抽出中...")
+        from core.practical_optimizer import PracticalDocumentProcessor, PracticalConfig
         config = PracticalConfig()
         processor = PracticalDocumentProcessor(config)
         
@@ -129,7 +168,7 @@ def extract_text_from_pdf(pdf_path: str, output_path: Optional[str] = None,
                 continue
             
             all_text.append(f"\n[ページ {page_num}]\n")
-            all_text.append("-"*40 + "\n")
+            all_text.append(DASH40)
             
             # テキストコンテンツ
             if 'text' in page_info and page_info['text']:
@@ -141,9 +180,7 @@ def extract_text_from_pdf(pdf_path: str, output_path: Optional[str] = None,
                 for table_data in page_info['structured_data']:
                     if table_data['type'] == 'table':
                         all_text.append("\n[表]\n")
-                        for row in table_data['data']:
-                            all_text.append(" | ".join(str(v) for v in row.values()))
-                            all_text.append("\n")
+                        all_text.append(_format_table_rows(table_data['data']))
             
             # 画像ページの場合
             if page_info['processing_method'] in ['image_gemini', 'image_with_analysis']:
@@ -153,12 +190,13 @@ def extract_text_from_pdf(pdf_path: str, output_path: Optional[str] = None,
     else:
         # シンプルな抽出
         print("シンプルなテキスト抽出中...")
+        import fitz
         doc = fitz.open(pdf_path)
         
         for page_num in range(doc.page_count):
             page = doc[page_num]
             all_text.append(f"\n[ページ {page_num + 1}]\n")
-            all_text.append("-"*40 + "\n")
+            all_text.append(DASH40)
             
             text = page.get_text()
             all_text.append(text)
@@ -167,8 +205,9 @@ def extract_text_from_pdf(pdf_path: str, output_path: Optional[str] = None,
         doc.close()
         print(f"抽出完了: {doc.page_count}ページ")
     
-    # 結合して保存
+    # 結合して保存（断片のリストは書き込み前に解放）
     full_text = "".join(all_text)
+    del all_text
     
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(full_text)
@@ -199,7 +238,7 @@ def main():
 """
     )
     
-    parser.add_argument('input', help='入力ファイル（PDFまたはprocessing_summary.json）')
+    parser.add_argument('input', help='入力ファイル（PDFまたはprocessing_summary.json/.msgpack.zst）')
     parser.add_argument('-o', '--output', help='出力テキストファイル')
     parser.add_argument('--from-summary', action='store_true', 
                        help='processing_summary.jsonから抽出')
@@ -214,7 +253,7 @@ def main():
         sys.exit(1)
     
     # 処理実行
-    if args.from_summary or args.input.endswith('.json'):
+    if args.from_summary or is_summary_file(args.input):
         # JSONから抽出
         extract_text_from_summary(args.input, args.output)
     else:
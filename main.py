@@ -6,10 +6,11 @@
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import argparse
 import json
 from datetime import datetime
+from contextlib import nullcontext
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -18,22 +19,21 @@ load_dotenv()
 # Add current directory to path
 sys.path.append(str(Path(__file__).parent))
 
-from core.practical_optimizer import (
-    PracticalConfig,
-    PracticalDocumentProcessor,
-    calculate_roi
-)
-from config.config import Config
+# 処理器（PyMuPDF・numpy等を読み込む）は使用時に読み込み、--helpや引数エラーを速くする
+if TYPE_CHECKING:
+    from core.practical_optimizer import PracticalConfig
 
 
 class AdvancedRAGPreprocessor:
     """AdvancedRAG用の前処理システム"""
     
-    def __init__(self, config: Optional[PracticalConfig] = None):
+    def __init__(self, config: Optional['PracticalConfig'] = None):
         """
         Args:
             config: カスタム設定（省略時はデフォルト設定を使用）
         """
+        from core.practical_optimizer import PracticalDocumentProcessor
+        
         self.config = config or self._get_default_config()
         self.processor = PracticalDocumentProcessor(self.config)
         self.stats = {
@@ -43,8 +43,14 @@ class AdvancedRAGPreprocessor:
             'processing_time': 0
         }
     
-    def _get_default_config(self) -> PracticalConfig:
+    def pool_scope(self):
+        """with文の間、ページ処理用のプロセスプールを複数PDFで共有する"""
+        return self.processor.pool_scope()
+    
+    def _get_default_config(self) -> 'PracticalConfig':
         """日本語技術文書用のデフォルト設定"""
+        from core.practical_optimizer import PracticalConfig
+        
         return PracticalConfig(
             # 日本語文書に最適化された閾値
             quick_text_density_threshold=0.75,
@@ -111,6 +117,7 @@ class AdvancedRAGPreprocessor:
         self.stats['processing_time'] += results['processing_time']
         
         # ROI計算
+        from core.practical_optimizer import calculate_roi
         roi_info = calculate_roi(results)
         
         # サマリー表示
@@ -131,7 +138,10 @@ class AdvancedRAGPreprocessor:
         Returns:
             各ファイルの処理結果リスト
         """
-        pdf_files = list(Path(directory).glob("*.pdf"))
+        # glob("*.pdf")と同じ対象（隠しファイル以外の*.pdf）をscandirで名前だけから判定
+        with os.scandir(directory) as entries:
+            pdf_files = [entry.path for entry in entries
+                         if entry.name.endswith('.pdf') and not entry.name.startswith('.')]
         if not pdf_files:
             print(f"PDFファイルが見つかりません: {directory}")
             return []
@@ -139,18 +149,20 @@ class AdvancedRAGPreprocessor:
         print(f"{len(pdf_files)}個のPDFファイルを処理します")
         
         results = []
-        for pdf_path in pdf_files:
-            try:
-                result = self.process_pdf(str(pdf_path), output_dir, use_parallel=use_parallel)
-                results.append(result)
-            except Exception as e:
-                print(f"エラー: {pdf_path} - {str(e)}")
-                results.append({
-                    'pdf_path': str(pdf_path),
-                    'error': str(e),
-                    'total_pages': 0,
-                    'processing_time': 0
-                })
+        # 並列処理時はワーカープロセスを全ファイルで使い回す
+        with self.pool_scope() if use_parallel else nullcontext():
+            for pdf_path in pdf_files:
+                try:
+                    result = self.process_pdf(pdf_path, output_dir, use_parallel=use_parallel)
+                    results.append(result)
+                except Exception as e:
+                    print(f"エラー: {pdf_path} - {str(e)}")
+                    results.append({
+                        'pdf_path': pdf_path,
+                        'error': str(e),
+                        'total_pages': 0,
+                        'processing_time': 0
+                    })
         
         # 全体統計表示
         self._print_overall_stats()
@@ -227,6 +239,8 @@ def main():
     
     args = parser.parse_args()
     
+    from core.practical_optimizer import PracticalConfig
+    
     # カスタム設定の読み込み
     config = None
     if args.config:
@@ -4,16 +4,40 @@
 Gemini 2.0 Flash対応
 """
 
+import io
 import os
 import sys
+import asyncio
+import hashlib
 import argparse
 from pathlib import Path
 import json
+import time
+import base64
+import queue
+import threading
+import logging
+import logging.handlers
 import shutil
-from typing import Optional, Dict
+import tempfile
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from functools import lru_cache, partial
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from google.api_core import retry as google_retry
 from dotenv import load_dotenv
 
+try:
+    # Batch API用の新SDK（google-genai）
+    from google import genai as google_genai
+    from google.genai import types as genai_types
+    BATCH_API_AVAILABLE = True
+except ImportError:
+    BATCH_API_AVAILABLE = False
+
 # .envファイルを読み込み
 load_dotenv()
 
@@ -21,20 +45,254 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from core.practical_optimizer import PracticalDocumentProcessor, PracticalConfig
 from export_separated import SeparatedExporter
-from extract_text import extract_text_from_summary
+from extract_text import extract_text_from_pages
+from core.summary_io import write_summary
+from prompts import FLOWCHART_PAGE_PROMPT, TABLE_PAGE_PROMPT, IMAGE_PAGE_PROMPT
+
+# Gemini解析の同時リクエスト数と再試行設定
+GEMINI_MAX_CONCURRENCY = 8
+GEMINI_MAX_RETRIES = 3
+GEMINI_RETRY_BASE_DELAY = 1.0  # 秒（試行ごとに2倍）
+_GEMINI_RETRYABLE_ERRORS = (google_exceptions.ResourceExhausted,
+                            google_exceptions.DeadlineExceeded)
+
+GEMINI_MODEL_NAME = 'gemini-2.0-flash-exp'
+GEMINI_PREFLIGHT_TIMEOUT = 10  # 秒（事前確認のリクエスト）
+_GEMINI_SETUP_LOCK = threading.Lock()
+
+# Batch APIのポーリング間隔と終了状態
+GEMINI_BATCH_POLL_INTERVAL = 30  # 秒
+_BATCH_DONE_STATES = ('JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED',
+                      'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED')
+
+# ページタイプごとのプロンプト（該当しないタイプはIMAGE_PAGE_PROMPT）
+PROMPT_BY_PAGE_TYPE = {
+    'flowchart': FLOWCHART_PAGE_PROMPT,
+    'complex_table': TABLE_PAGE_PROMPT,
+}
+
+# Geminiに送る画像の最大辺（px）とJPEG品質
+GEMINI_IMAGE_MAX_SIDE = 1568
+GEMINI_JPEG_QUALITY = 85
+# --hi-res指定時に元解像度のまま送るページタイプ
+_HI_RES_PAGE_TYPES = ('complex_table', 'flowchart')
+
+# 画像の前処理（デコード・縮小・JPEG圧縮）をプロセスプールで行う設定
+# （GILを握るPIL処理をイベントループから切り離す。ページは数枚ずつまとめて渡す）
+GEMINI_PREP_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+GEMINI_PREP_BATCH_SIZE = 4
+GEMINI_PREP_MIN_PAGES = 8
+# プロセスプールを使わない場合に画像を先読みするスレッド数
+# （セマフォ内で読むので先読みは同時リクエスト数までに制限される）
+GEMINI_PREFETCH_THREADS = 4
+
+# PDFヘッダー（%PDF-）を探す先頭のバイト数（仕様上1024バイト以内にあればよい）
+PDF_HEADER_SEARCH_BYTES = 1024
+
+# PDFの基準解像度（--dpiから画像化倍率への換算用）
+PDF_BASE_DPI = 72
+
+# 解析結果のキャッシュ（出力ディレクトリ配下）
+GEMINI_CACHE_SUBDIR = Path('.cache') / 'gemini'
+
+# ページごとの警告などはロガー経由で出力（Gemini解析中はキュー経由で別スレッドが書き出す）
+logger = logging.getLogger(__name__)
+
+# パイプラインの終端を示す番兵
+_PIPELINE_END = object()
+
+
+def _iter_queue(q: queue.Queue) -> Iterator[Dict]:
+    """番兵が来るまでキューの要素を順に返す"""
+    while True:
+        item = q.get()
+        if item is _PIPELINE_END:
+            return
+        yield item
+
+
+@contextmanager
+def _queued_log_output():
+    """ロガーの出力をキューに積み、標準出力への書き込みはリスナースレッドに任せる"""
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    
+    logger.addHandler(queue_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    try:
+        yield
+    finally:
+        # 溜まっているログを書き出してから戻す
+        listener.stop()
+        logger.removeHandler(queue_handler)
+        logger.propagate = True
+
+
+def _link_or_copy(src: str, dst: str):
+    """ハードリンクで配置し、できなければコピー"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _publish_images(temp_img_dir: Path, images_dir: Path, keep_intermediate: bool):
+    """
+    一時画像ディレクトリをimages/として公開
+    
+    中間ファイルを残す場合はシンボリックリンク（作れなければファイルごとのハードリンク）で
+    両方のディレクトリから参照し、残さない場合はリネームで移動する
+    """
+    if images_dir.is_symlink():
+        images_dir.unlink()
+    elif images_dir.exists():
+        shutil.rmtree(images_dir)
+    
+    if keep_intermediate:
+        try:
+            # 同じ親ディレクトリなので相対リンクにする
+            os.symlink(temp_img_dir.name, images_dir, target_is_directory=True)
+        except OSError:
+            # シンボリックリンクの権限がない環境（Windowsなど）
+            shutil.copytree(temp_img_dir, images_dir, copy_function=_link_or_copy)
+        return
+    
+    try:
+        # 同じ出力ディレクトリ内なのでリネームだけで済む
+        os.replace(temp_img_dir, images_dir)
+    except OSError:
+        # 別デバイスの場合はコピーで移動
+        shutil.move(str(temp_img_dir), str(images_dir))
+
+
+async def _batch_item(future: asyncio.Future, idx: int):
+    """まとめて前処理した結果からidx番目を取り出す"""
+    return (await future)[idx]
+
+
+def _gemini_prompt(page_type: str) -> str:
+    """ページタイプに応じたプロンプト"""
+    return PROMPT_BY_PAGE_TYPE.get(page_type, IMAGE_PAGE_PROMPT)
+
+
+@lru_cache(maxsize=None)
+def _get_gemini_model(model_name: str, api_key: str):
+    """
+    Geminiモデルを取得（同じモデル・APIキーならプロセス内で1つを共有）
+    
+    UnifiedProcessorを複数作るバッチ処理でも設定とクライアントの初期化は1回で済む
+    """
+    with _GEMINI_SETUP_LOCK:
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel(model_name)
+
+
+@lru_cache(maxsize=None)
+def _prompt_digest(page_type: str) -> bytes:
+    """プロンプトテンプレートのハッシュ（テンプレート変更でキャッシュを無効化）"""
+    return hashlib.sha256(_gemini_prompt(page_type).encode('utf-8')).digest()
+
+
+def _cache_key(image_data: bytes, page_type: str) -> str:
+    """画像バイト列とプロンプトテンプレートから求めるキャッシュキー"""
+    digest = hashlib.sha256(image_data)
+    digest.update(_prompt_digest(page_type))
+    return digest.hexdigest()
+
+
+def _prepare_gemini_image(image_data: bytes, max_side: Optional[int]) -> Tuple[str, bytes]:
+    """
+    送信用に画像を縮小してJPEGに再圧縮（縮小が不要な画像はデコードせずそのまま）
+    
+    Args:
+        image_data: ページ画像（PNG）のバイト列
+        max_side: 縮小後の最大辺（px）。Noneなら元の画像のまま送る
+    
+    Returns:
+        (MIMEタイプ, 画像バイト列)
+    """
+    if max_side is None:
+        return 'image/png', image_data
+    
+    from PIL import Image
+    
+    # デコード済みのビットマップは変換後すぐに閉じ、送信中はJPEGのバイト列だけを保持する
+    # （thumbnailはJPEGならdraftで縮小デコードする）
+    buf = io.BytesIO()
+    with Image.open(io.BytesIO(image_data)) as image:
+        # 縮小が不要なら（ヘッダーを読んだだけで）元のバイト列をそのまま送る
+        if max(image.size) <= max_side:
+            return Image.MIME.get(image.format, 'image/png'), image_data
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        if image.mode == 'RGB':
+            image.save(buf, 'JPEG', quality=GEMINI_JPEG_QUALITY, optimize=True)
+        else:
+            with image.convert('RGB') as rgb:
+                rgb.save(buf, 'JPEG', quality=GEMINI_JPEG_QUALITY, optimize=True)
+    return 'image/jpeg', buf.getvalue()
+
+
+def _prepare_page_image(image_path: str, page_type: str, max_side: Optional[int],
+                        cache_dir: Optional[Path]) -> Tuple[str, Optional[str], Optional[bytes]]:
+    """
+    ページ画像を読み込み、キャッシュキーと送信用画像を求める
+    
+    Returns:
+        (キャッシュキー, MIMEタイプ, 画像バイト列)
+        キャッシュファイルがあれば画像の変換は省略し、MIMEタイプと画像はNone
+    """
+    with open(image_path, 'rb') as f:
+        image_data = f.read()
+    cache_key = _cache_key(image_data, page_type)
+    if cache_dir is not None and (cache_dir / f"{cache_key}.json").exists():
+        return cache_key, None, None
+    return (cache_key,) + _prepare_gemini_image(image_data, max_side)
+
+
+def _prepare_page_batch(items: List[Tuple[str, str, Optional[int]]],
+                        cache_dir: Optional[Path]) -> List[Tuple]:
+    """ワーカープロセスで数ページ分の画像をまとめて前処理（プロセス単位で渡せるようトップレベルに定義）"""
+    return [_prepare_page_image(image_path, page_type, max_side, cache_dir)
+            for image_path, page_type, max_side in items]
 
 
 class UnifiedProcessor:
     """統一プロセッサー - すべての処理を一括実行"""
     
-    def __init__(self, output_format: str = "all", use_gemini: bool = True):
+    def __init__(self, output_format: str = "all", use_gemini: bool = True,
+                 use_batch_api: bool = False, hi_res: bool = False,
+                 dpi: Optional[int] = None, max_image_dim: int = GEMINI_IMAGE_MAX_SIDE):
         """
         Args:
             output_format: 出力形式 (all/text/image/separated)
             use_gemini: Gemini 2.0 Flashを使用するか
+            use_batch_api: Gemini Batch APIでまとめて解析するか（オフライン処理向け）
+            hi_res: 表・フローチャートの画像を縮小せずに送るか
+            dpi: ページ画像の解像度（Noneなら設定の既定値）
+            max_image_dim: Geminiに送る画像の最大辺（px）
         """
         self.output_format = output_format
         self.use_gemini = use_gemini
+        self.use_batch_api = use_batch_api
+        self.hi_res = hi_res
+        self.max_image_dim = max_image_dim
+        self.gemini_api_key = None
+        
+        # Gemini解析キャッシュ（ディスク + 実行中のメモ）
+        self.cache_dir = None
+        self._analysis_memo = {}
+        
+        # ページ分析器（コンパイル済みパターン・ページキャッシュ）を処理間で再利用
+        config = PracticalConfig()
+        if dpi is not None:
+            # 画像化時の倍率はPDFの基準解像度（72dpi）に対する比
+            config.image_dpi_multiplier = dpi / PDF_BASE_DPI
+        self.processor = PracticalDocumentProcessor(config)
         
         # Gemini設定
         if use_gemini:
@@ -44,9 +302,9 @@ class UnifiedProcessor:
         """Gemini 2.0 Flash設定"""
         gemini_api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
         if gemini_api_key:
-            genai.configure(api_key=gemini_api_key)
-            # Gemini 2.0 Flash Experimental（最新版）
-            self.gemini_model = genai.GenerativeModel('gemini-2.0-flash-exp')
+            self.gemini_api_key = gemini_api_key
+            # Gemini 2.0 Flash Experimental（最新版）。プロセス内で使い回す
+            self.gemini_model = _get_gemini_model(GEMINI_MODEL_NAME, gemini_api_key)
             print("[OK] Gemini 2.0 Flash準備完了")
         else:
             print("[WARNING] GEMINI_API_KEY未設定 - 画像のAI解析は利用できません")
@@ -67,9 +325,6 @@ class UnifiedProcessor:
             処理結果の統計情報
         """
         pdf_path = Path(pdf_path)
-        if not pdf_path.exists():
-            print(f"[ERROR] ファイルが見つかりません: {pdf_path}")
-            sys.exit(1)
         
         # 出力ディレクトリ設定
         if output_dir is None:
@@ -77,18 +332,17 @@ class UnifiedProcessor:
         else:
             output_dir = Path(output_dir)
         
+        # 時間のかかる処理の前に入力・出力・Gemini設定を確認
+        self._preflight(pdf_path, output_dir)
+        
         print(f"\n[INPUT] {pdf_path}")
         print(f"[OUTPUT] {output_dir}")
         print(f"[FORMAT] {self.output_format}")
         print("="*60)
         
-        # メイン出力ディレクトリ作成
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
         # ステップ1: PDFを処理
         print("\n[1/3] PDF解析中...")
-        config = PracticalConfig()
-        processor = PracticalDocumentProcessor(config)
+        processor = self.processor
         
         # 一時ディレクトリに画像を保存
         temp_img_dir = output_dir / "_temp_images"
@@ -99,11 +353,6 @@ class UnifiedProcessor:
         else:
             results = processor.process_pdf(str(pdf_path), str(temp_img_dir))
         
-        # processing_summary.jsonを保存
-        summary_path = output_dir / "processing_summary.json"
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2, default=str)
-        
         print(f"  [OK] 解析完了: {results['total_pages']}ページ")
         
         stats = {
@@ -115,28 +364,44 @@ class UnifiedProcessor:
         }
         
         # ステップ2: Gemini解析（画像ページがある場合）
-        if self.use_gemini and self.gemini_model and results['summary']['image_pages'] > 0:
+        self.cache_dir = output_dir / GEMINI_CACHE_SUBDIR
+        analyze = bool(self.use_gemini and self.gemini_model and results['summary']['image_pages'] > 0)
+        if analyze:
             print(f"\n[2/3] Gemini 2.0 Flashで画像解析中...")
-            self._analyze_images_with_gemini(results, temp_img_dir)
-            print(f"  [OK] 画像解析完了: {results['summary']['image_pages']}ページ")
+            # Batch APIで解析済みならパイプラインでは解析しない
+            if self.use_batch_api and self._analyze_images_with_batch_api(results):
+                analyze = False
         else:
             print("\n[2/3] 画像解析スキップ")
         
-        # ステップ3: 出力形式に応じた処理
+        # ステップ3: 出力形式に応じた処理（Gemini解析と並行してページ順に書き出す）
         print(f"\n[3/3] データ出力中...")
         
+        consumers = []
         if self.output_format in ["all", "text"]:
             # テキスト出力
             text_file = output_dir / "extracted_text.txt"
-            extract_text_from_summary(str(summary_path), str(text_file))
-            stats['output_files']['text'] = str(text_file)
-            print(f"  [OK] テキスト: {text_file.name}")
+            consumers.append(partial(extract_text_from_pages, results['pdf_path'],
+                                     results['total_pages'], output_path=str(text_file)))
         
         if self.output_format in ["all", "separated"]:
             # タイプ別分離出力
             separated_dir = output_dir / "separated"
             exporter = SeparatedExporter(str(separated_dir))
-            sep_stats = exporter.export_from_summary(str(summary_path))
+            consumers.append(partial(exporter.export_from_pages, results['total_pages']))
+        
+        outputs = asyncio.run(self._run_pipeline(results, consumers, analyze))
+        
+        if analyze:
+            print(f"  [OK] 画像解析完了: {results['summary']['image_pages']}ページ")
+        
+        if self.output_format in ["all", "text"]:
+            outputs.pop(0)
+            stats['output_files']['text'] = str(text_file)
+            print(f"  [OK] テキスト: {text_file.name}")
+        
+        if self.output_format in ["all", "separated"]:
+            sep_stats = outputs.pop(0)
             stats['table_pages'] = sep_stats['table_files']
             stats['output_files']['separated'] = str(separated_dir)
             print(f"  [OK] 分離出力: {separated_dir.name}/")
@@ -144,13 +409,14 @@ class UnifiedProcessor:
             print(f"     - 表: {sep_stats['table_files']}ファイル")
             print(f"     - 画像: {sep_stats['image_files']}ファイル")
         
+        # processing_summary.jsonはGemini解析結果を含めて最後に保存
+        write_summary(results, output_dir / "processing_summary", as_json=True)
+        
         if self.output_format in ["all", "image"]:
-            # 画像を正式な場所に移動
+            # 画像を正式な場所に配置
             images_dir = output_dir / "images"
             if temp_img_dir.exists():
-                if images_dir.exists():
-                    shutil.rmtree(images_dir)
-                shutil.move(str(temp_img_dir), str(images_dir))
+                _publish_images(temp_img_dir, images_dir, keep_intermediate)
                 stats['output_files']['images'] = str(images_dir)
                 print(f"  [OK] 画像: {images_dir.name}/")
         
@@ -164,52 +430,313 @@ class UnifiedProcessor:
         
         return stats
     
-    def _analyze_images_with_gemini(self, results: Dict, img_dir: Path):
-        """Gemini 2.0 Flashで画像を解析"""
-        if not self.gemini_model:
-            return
+    def _preflight(self, pdf_path: Path, output_dir: Path):
+        """
+        PDF解析の前に失敗する条件を確認し、問題があれば終了する
+        - 入力がPDFとして読めること（先頭の%PDF-）
+        - 出力ディレクトリに書き込めること（なければ作成）
+        - Gemini使用時はAPIキーが有効であること（トークン数の取得で確認）
+        """
+        if not pdf_path.is_file():
+            print(f"[ERROR] ファイルが見つかりません: {pdf_path}")
+            sys.exit(1)
+        try:
+            with open(pdf_path, 'rb') as f:
+                head = f.read(PDF_HEADER_SEARCH_BYTES)
+        except OSError as e:
+            print(f"[ERROR] ファイルを読み込めません: {pdf_path} ({e})")
+            sys.exit(1)
+        if b'%PDF-' not in head:
+            print(f"[ERROR] PDFファイルではありません: {pdf_path}")
+            sys.exit(1)
+        
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"[ERROR] 出力ディレクトリを作成できません: {output_dir} ({e})")
+            sys.exit(1)
+        if not os.access(output_dir, os.W_OK):
+            print(f"[ERROR] 出力ディレクトリに書き込めません: {output_dir}")
+            sys.exit(1)
+        
+        if self.use_gemini and self.gemini_model:
+            try:
+                # 生成は行わず、APIキーと接続だけを確認
+                self.gemini_model.count_tokens("ping", request_options={
+                    'timeout': GEMINI_PREFLIGHT_TIMEOUT,
+                    'retry': google_retry.Retry(timeout=GEMINI_PREFLIGHT_TIMEOUT),
+                })
+            except Exception as e:
+                print(f"[ERROR] Gemini APIに接続できません: {e}")
+                print("  --no-gemini で画像解析なしで処理できます")
+                sys.exit(1)
+    
+    async def _run_pipeline(self, results: Dict, consumers: List[Callable], analyze: bool) -> List:
+        """
+        Gemini解析と出力処理を並行に実行
+        
+        画像ページの解析は同時実行数を制限して並行にリクエストし、各出力処理は
+        別スレッドでページをページ順に受け取る（解析待ちの画像ページまでは先に書き出せる）
         
-        from PIL import Image
+        Args:
+            results: 処理結果
+            consumers: ページのイテレータを受け取る出力処理
+            analyze: 画像ページをGeminiで解析するか
         
+        Returns:
+            各出力処理の戻り値（consumersの順）
+        """
+        loop = asyncio.get_running_loop()
+        queues = [queue.Queue() for _ in consumers]
+        outputs = [loop.run_in_executor(None, consumer, _iter_queue(q))
+                   for consumer, q in zip(consumers, queues)]
+        
+        # 画像ページはページタイプごとにまとめて投入（同じプロンプトのリクエストが続く）
+        groups = defaultdict(list)
         for page_info in results['processed_pages']:
-            if 'image_path' in page_info:
-                img_path = Path(page_info['image_path'])
-                if img_path.exists():
+            if analyze and 'image_path' in page_info and Path(page_info['image_path']).exists():
+                groups[page_info.get('page_type', 'unknown')].append(page_info)
+        image_pages = [page_info for group in groups.values() for page_info in group]
+        workers = min(GEMINI_PREP_MAX_WORKERS, len(image_pages))
+        use_pool = workers > 1 and len(image_pages) >= GEMINI_PREP_MIN_PAGES
+        
+        try:
+            with _queued_log_output(), \
+                    ProcessPoolExecutor(max_workers=workers) if use_pool \
+                    else ThreadPoolExecutor(max_workers=GEMINI_PREFETCH_THREADS) as executor:
+                prepared = self._submit_image_preparation(image_pages, executor)
+                
+                semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+                tasks = {
+                    id(page_info): asyncio.create_task(self._analyze_page_with_gemini(
+                        page_info, semaphore, prepared.get(id(page_info))))
+                    for page_info in image_pages
+                }
+                
+                for page_info in results['processed_pages']:
+                    task = tasks.get(id(page_info))
+                    if task is not None:
+                        await task
+                    for q in queues:
+                        q.put(page_info)
+        finally:
+            # 中断時も出力スレッドが待ち続けないよう終端を送る
+            for q in queues:
+                q.put(_PIPELINE_END)
+        
+        return list(await asyncio.gather(*outputs))
+    
+    def _submit_image_preparation(self, image_pages: List[Dict],
+                                  executor: Executor) -> Dict[int, Callable]:
+        """
+        画像の前処理を実行器に割り当てる
+        
+        プロセスプールにはページのまとまりごとに投入し、スレッドプールでは各ページの
+        解析タスクが呼び出した時点で読み込む（他ページのリクエスト待ちの間に先読みされる）
+        
+        Returns:
+            id(page_info) -> 前処理結果を返すawaitableを作る関数
+        """
+        prepared = {}
+        if isinstance(executor, ThreadPoolExecutor):
+            loop = asyncio.get_running_loop()
+            for page_info in image_pages:
+                page_type = page_info.get('page_type', 'unknown')
+                prepared[id(page_info)] = partial(
+                    loop.run_in_executor, executor, _prepare_page_image, page_info['image_path'],
+                    page_type, self._max_image_side(page_type), self.cache_dir)
+            return prepared
+        
+        for start in range(0, len(image_pages), GEMINI_PREP_BATCH_SIZE):
+            batch = image_pages[start:start + GEMINI_PREP_BATCH_SIZE]
+            items = []
+            for page_info in batch:
+                page_type = page_info.get('page_type', 'unknown')
+                items.append((page_info['image_path'], page_type, self._max_image_side(page_type)))
+            future = asyncio.wrap_future(
+                executor.submit(_prepare_page_batch, items, self.cache_dir))
+            for idx, page_info in enumerate(batch):
+                prepared[id(page_info)] = partial(_batch_item, future, idx)
+        return prepared
+    
+    async def _analyze_page_with_gemini(self, page_info: Dict, semaphore: asyncio.Semaphore,
+                                        prepared: Optional[Callable] = None):
+        """
+        1ページの画像をGeminiで解析し、結果をpage_infoに格納
+        
+        Args:
+            prepared: 前処理結果を返すawaitableを作る関数（Noneならここで前処理）
+        """
+        page_type = page_info.get('page_type', 'unknown')
+        async with semaphore:
+            try:
+                # 画像を読み込み、解析済みならキャッシュを使う
+                if prepared is not None:
+                    cache_key, mime_type, upload_data = await prepared()
+                else:
+                    cache_key, mime_type, upload_data = _prepare_page_image(
+                        page_info['image_path'], page_type, self._max_image_side(page_type),
+                        self.cache_dir)
+                cached = self._load_cached_analysis(cache_key)
+                if cached is not None:
+                    page_info['gemini_analysis'] = cached
+                    return
+                if upload_data is None:
+                    # キャッシュファイルが読めなかった場合は改めて変換する
+                    with open(page_info['image_path'], 'rb') as f:
+                        mime_type, upload_data = _prepare_gemini_image(
+                            f.read(), self._max_image_side(page_type))
+                image = {'mime_type': mime_type, 'data': upload_data}
+                
+                # ページタイプに応じたプロンプト
+                prompt = _gemini_prompt(page_type)
+                
+                # Gemini解析（レート制限・タイムアウトは指数バックオフで再試行）
+                for attempt in range(GEMINI_MAX_RETRIES):
                     try:
-                        # 画像を読み込み
-                        image = Image.open(img_path)
-                        
-                        # ページタイプに応じたプロンプト
-                        page_type = page_info.get('page_type', 'unknown')
-                        
-                        if page_type == 'flowchart':
-                            prompt = """この画像はフローチャートです。以下を分析してください：
-1. プロセスの流れを順番に説明
-2. 各ステップの内容
-3. 分岐条件があれば説明
-4. 全体の目的
-
-簡潔に日本語で説明してください。"""
-                        elif page_type == 'complex_table':
-                            prompt = """この画像は表です。以下を抽出してください：
-1. 表のヘッダー（列名）
-2. 主要なデータ項目
-3. 表が示す内容の要約
-
-構造化された形式で日本語で記述してください。"""
-                        else:
-                            prompt = """この画像の内容を詳細に説明してください。
-図表、テキスト、データなどすべての要素を含めて日本語で記述してください。"""
-                        
-                        # Gemini解析
-                        response = self.gemini_model.generate_content([prompt, image])
-                        
-                        # 結果を保存
-                        page_info['gemini_analysis'] = response.text
-                        
-                    except Exception as e:
-                        print(f"    [WARNING] ページ{page_info['page_number']}の解析エラー: {e}")
-                        page_info['gemini_analysis'] = f"解析エラー: {str(e)}"
+                        response = await self.gemini_model.generate_content_async([prompt, image])
+                        break
+                    except _GEMINI_RETRYABLE_ERRORS:
+                        if attempt == GEMINI_MAX_RETRIES - 1:
+                            raise
+                        await asyncio.sleep(GEMINI_RETRY_BASE_DELAY * 2 ** attempt)
+                
+                # 結果を保存
+                page_info['gemini_analysis'] = response.text
+                self._store_cached_analysis(cache_key, response.text)
+                
+            except Exception as e:
+                logger.warning("    [WARNING] ページ%sの解析エラー: %s", page_info['page_number'], e)
+                page_info['gemini_analysis'] = f"解析エラー: {str(e)}"
+    
+    def _analyze_images_with_batch_api(self, results: Dict) -> bool:
+        """
+        Gemini Batch APIで画像ページをまとめて解析
+        
+        Returns:
+            結果を取り込めたらTrue（Falseならリアルタイム解析にフォールバック）
+        """
+        if not BATCH_API_AVAILABLE:
+            print("  [WARNING] google-genai未インストール - リアルタイム解析で処理します")
+            return False
+        
+        try:
+            # 未解析ページの(プロンプト, 画像)をJSONLのリクエストに変換
+            pages = {}  # key -> (page_info, キャッシュキー)
+            with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='utf-8',
+                                             delete=False) as f:
+                batch_input = f.name
+                for page_info in results['processed_pages']:
+                    if 'image_path' not in page_info or not Path(page_info['image_path']).exists():
+                        continue
+                    page_type = page_info.get('page_type', 'unknown')
+                    with open(page_info['image_path'], 'rb') as img:
+                        image_data = img.read()
+                    cache_key = _cache_key(image_data, page_type)
+                    cached = self._load_cached_analysis(cache_key)
+                    if cached is not None:
+                        page_info['gemini_analysis'] = cached
+                        continue
+                    
+                    key = f"page-{page_info['page_number']}"
+                    pages[key] = (page_info, cache_key)
+                    mime_type, upload_data = _prepare_gemini_image(image_data,
+                                                                   self._max_image_side(page_type))
+                    request = {'contents': [{'role': 'user', 'parts': [
+                        {'text': _gemini_prompt(page_type)},
+                        {'inline_data': {'mime_type': mime_type,
+                                         'data': base64.b64encode(upload_data).decode('ascii')}},
+                    ]}]}
+                    f.write(json.dumps({'key': key, 'request': request}, ensure_ascii=False))
+                    f.write('\n')
+            if not pages:
+                os.unlink(batch_input)
+                return True
+            
+            # アップロードしてジョブを投入
+            client = google_genai.Client(api_key=self.gemini_api_key)
+            try:
+                uploaded = client.files.upload(
+                    file=batch_input,
+                    config=genai_types.UploadFileConfig(mime_type='jsonl'),
+                )
+            finally:
+                os.unlink(batch_input)
+            
+            job = client.batches.create(model=GEMINI_MODEL_NAME, src=uploaded.name)
+            print(f"  [BATCH] ジョブ投入: {job.name}（{len(pages)}ページ）")
+            
+            # 完了までポーリング
+            while job.state.name not in _BATCH_DONE_STATES:
+                time.sleep(GEMINI_BATCH_POLL_INTERVAL)
+                job = client.batches.get(name=job.name)
+            
+            if job.state.name != 'JOB_STATE_SUCCEEDED':
+                print(f"  [WARNING] バッチジョブ失敗: {job.state.name} - リアルタイム解析で処理します")
+                return False
+            
+            # 結果をpage_numberごとにマージ
+            content = client.files.download(file=job.dest.file_name)
+            for line in content.decode('utf-8').splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if item.get('key') not in pages:
+                    continue
+                page_info, cache_key = pages[item['key']]
+                if 'response' in item:
+                    parts = item['response']['candidates'][0]['content']['parts']
+                    page_info['gemini_analysis'] = ''.join(part.get('text', '') for part in parts)
+                    self._store_cached_analysis(cache_key, page_info['gemini_analysis'])
+                else:
+                    page_info['gemini_analysis'] = f"解析エラー: {item.get('error')}"
+            
+            # 結果が返らなかったページは解析エラー扱い
+            for page_info, _ in pages.values():
+                page_info.setdefault('gemini_analysis', "解析エラー: バッチ結果なし")
+            return True
+        
+        except Exception as e:
+            print(f"  [WARNING] Batch APIエラー: {e} - リアルタイム解析で処理します")
+            return False
+    
+    def _max_image_side(self, page_type: str) -> Optional[int]:
+        """Geminiに送る画像の最大辺（Noneなら縮小しない）"""
+        if self.hi_res and page_type in _HI_RES_PAGE_TYPES:
+            return None
+        return self.max_image_dim
+    
+    def _load_cached_analysis(self, cache_key: str) -> Optional[str]:
+        """キャッシュ済みの解析結果（なければNone）"""
+        if cache_key in self._analysis_memo:
+            return self._analysis_memo[cache_key]
+        if self.cache_dir is None:
+            return None
+        
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                text = json.load(f)['gemini_analysis']
+        except (OSError, ValueError, KeyError):
+            return None
+        self._analysis_memo[cache_key] = text
+        return text
+    
+    def _store_cached_analysis(self, cache_key: str, text: str):
+        """解析結果をキャッシュに保存（一時ファイル経由で置き換え）"""
+        self._analysis_memo[cache_key] = text
+        if self.cache_dir is None:
+            return
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = self.cache_dir / f"{cache_key}.json"
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'gemini_analysis': text}, f, ensure_ascii=False)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning("    [WARNING] キャッシュ保存エラー: %s", e)
     
     def _print_summary(self, stats: Dict, output_dir: Path):
         """処理結果のサマリー表示"""
@@ -248,6 +775,15 @@ def main():
   # Geminiを使わない（高速）
   python process.py input.pdf --no-gemini
   
+  # Gemini Batch APIでまとめて解析（オフライン処理向け）
+  python process.py input.pdf --batch-api
+  
+  # 表・フローチャートは縮小せずに解析
+  python process.py input.pdf --hi-res
+  
+  # 解像度を下げて高速化（画像化150dpi、Geminiへは最大1024px）
+  python process.py input.pdf --dpi 150 --max-image-dim 1024
+  
   # シーケンシャル処理（メモリ節約）
   python process.py input.pdf --sequential
 
@@ -269,6 +805,27 @@ def main():
         action='store_true',
         help='Gemini解析を無効化（高速処理）'
     )
+    parser.add_argument(
+        '--batch-api',
+        action='store_true',
+        help='Gemini Batch APIで画像をまとめて解析（要google-genai、失敗時はリアルタイム解析）'
+    )
+    parser.add_argument(
+        '--hi-res',
+        action='store_true',
+        help='表・フローチャートの画像を縮小・JPEG圧縮せずにGeminiへ送る'
+    )
+    parser.add_argument(
+        '--dpi',
+        type=int,
+        help='ページ画像の解像度 (デフォルト: 144)'
+    )
+    parser.add_argument(
+        '--max-image-dim',
+        type=int,
+        default=GEMINI_IMAGE_MAX_SIDE,
+        help=f'Geminiに送る画像の最大辺px (デフォルト: {GEMINI_IMAGE_MAX_SIDE})'
+    )
     parser.add_argument(
         '--sequential',
         action='store_true',
@@ -285,7 +842,11 @@ def main():
     # プロセッサー作成
     processor = UnifiedProcessor(
         output_format=args.format,
-        use_gemini=not args.no_gemini
+        use_gemini=not args.no_gemini,
+        use_batch_api=args.batch_api,
+        hi_res=args.hi_res,
+        dpi=args.dpi,
+        max_image_dim=args.max_image_dim
     )
     
     # 処理実行
@@ -9,6 +9,9 @@ from .gemini_prompts import (
     IMAGE_PROMPT,
     FULL_PAGE_PROMPT,
     HYBRID_PAGE_PROMPT,
+    FLOWCHART_PAGE_PROMPT,
+    TABLE_PAGE_PROMPT,
+    IMAGE_PAGE_PROMPT,
 )
 
 __all__ = [
@@ -18,4 +21,7 @@ __all__ = [
     'IMAGE_PROMPT',
     'FULL_PAGE_PROMPT',
     'HYBRID_PAGE_PROMPT',
+    'FLOWCHART_PAGE_PROMPT',
+    'TABLE_PAGE_PROMPT',
+    'IMAGE_PAGE_PROMPT',
 ]
\ No newline at end of file
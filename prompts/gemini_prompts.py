@@ -59,6 +59,28 @@ HYBRID_PAGE_PROMPT = """このページの表やフローチャートを重点
 構造と関係性を明確に説明してください。"""
 
 
+# 画像ページ（process.py）の解析用プロンプト
+# フローチャートページ
+FLOWCHART_PAGE_PROMPT = """この画像はフローチャートです。以下を分析してください：
+1. プロセスの流れを順番に説明
+2. 各ステップの内容
+3. 分岐条件があれば説明
+4. 全体の目的
+
+簡潔に日本語で説明してください。"""
+
+# 複雑な表のページ
+TABLE_PAGE_PROMPT = """この画像は表です。以下を抽出してください：
+1. 表のヘッダー（列名）
+2. 主要なデータ項目
+3. 表が示す内容の要約
+
+構造化された形式で日本語で記述してください。"""
+
+# その他の画像ページ
+IMAGE_PAGE_PROMPT = """この画像の内容を詳細に説明してください。
+図表、テキスト、データなどすべての要素を含めて日本語で記述してください。"""
+
 def get_prompt(content_type: str, context: str = None) -> str:
     """
     コンテンツタイプに応じたプロンプトを取得